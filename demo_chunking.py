@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """Démonstration du système de chunking par sections."""
-from gpt_wiki_translator.chunking import create_chunks, get_chunk_stats
+from gpt_wiki_translator.chunking import create_chunks, get_chunk_stats, estimate_tokens
 
 # Exemple de wikitext avec plusieurs sections
 sample_wikitext = """{{Culture
@@ -68,7 +68,7 @@ def main():
             preview = chunk[:80].replace('\n', ' ')
             if len(chunk) > 80:
                 preview += '...'
-            print(f"  Chunk {i} ({len(chunk)} chars, ~{len(chunk)//3} tokens): {preview}")
+            print(f"  Chunk {i} ({len(chunk)} chars, ~{estimate_tokens(chunk)} tokens): {preview}")
 
 if __name__ == '__main__':
     main()
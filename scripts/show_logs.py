@@ -10,45 +10,44 @@ def format_log():
         print("❌ No log file found at logs/translated_log.csv")
         return
     
+    statuses = {}
+    total = 0
     with log_path.open('r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        rows = list(reader)
+        # Single streaming pass: print each entry and tally statuses as we go
+        for i, row in enumerate(reader, 1):
+            if i == 1:
+                print("\n📊 Translation Log\n")
+                print("="*80)
+            total = i
+            status = row['status']
+            statuses[status] = statuses.get(status, 0) + 1
+            
+            status_emoji = {
+                'translated': '✅',
+                'skipped': '⏭️',
+                'error': '❌'
+            }.get(status, '❓')
+            
+            print(f"\n{status_emoji} Entry #{i} - {status.upper()}")
+            print(f"   Source:  {row['source_page']} ({row['source_lang']})")
+            print(f"   Target:  {row['target_page']} ({row['target_lang']})")
+            print(f"   Date:    {row['date_iso']}")
+            
+            if row['notes']:
+                # Truncate long notes
+                notes = row['notes']
+                if len(notes) > 150:
+                    notes = notes[:150] + "..."
+                print(f"   Notes:   {notes}")
+            
+            print("-"*80)
     
-    if not rows:
+    if not total:
         print("ℹ️  No translations logged yet")
         return
     
-    print(f"\n📊 Translation Log ({len(rows)} entries)\n")
-    print("="*80)
-    
-    for i, row in enumerate(rows, 1):
-        status_emoji = {
-            'translated': '✅',
-            'skipped': '⏭️',
-            'error': '❌'
-        }.get(row['status'], '❓')
-        
-        print(f"\n{status_emoji} Entry #{i} - {row['status'].upper()}")
-        print(f"   Source:  {row['source_page']} ({row['source_lang']})")
-        print(f"   Target:  {row['target_page']} ({row['target_lang']})")
-        print(f"   Date:    {row['date_iso']}")
-        
-        if row['notes']:
-            # Truncate long notes
-            notes = row['notes']
-            if len(notes) > 150:
-                notes = notes[:150] + "..."
-            print(f"   Notes:   {notes}")
-        
-        print("-"*80)
-    
-    # Statistics
-    statuses = {}
-    for row in rows:
-        status = row['status']
-        statuses[status] = statuses.get(status, 0) + 1
-    
-    print(f"\n📈 Statistics:")
+    print(f"\n📈 Statistics ({total} entries):")
     for status, count in statuses.items():
         emoji = {'translated': '✅', 'skipped': '⏭️', 'error': '❌'}.get(status, '❓')
         print(f"   {emoji} {status.capitalize()}: {count}")
@@ -11,37 +11,120 @@ Logic:
   3. Compute the union mapping lang -> title across the cluster.
   4. For every page in the cluster ensure it contains the full set of interwiki links with correct targets.
      Perform at most ONE edit per page (batch replacement/appending).
-  5. Skip clusters already processed (signature = frozenset of lang:title pairs).
+  5. Skip clusters already processed (signature = sorted tuple of (lang, title) pairs).
+     Processed clusters and interwiki prefixes are persisted in logs/.sync_state.json so an
+     interrupted run (e.g. resumed with --from) does not redo finished clusters; --reset-state clears it.
 
 Notes:
   - Assumes same domain pattern where first subdomain is language code (fr., en., es., etc.).
   - Credentials taken from existing configuration (env vars).
   - Dry-run prints intended changes without editing pages.
   - When --page is used, endpoint is derived from URL and only that page's cluster is processed.
+  - Network work runs in small thread pools (SEED_WORKERS clusters, LINK_WORKERS pages) with at most
+    PER_ENDPOINT_REQUESTS concurrent page syncs per wiki.
 """
 from __future__ import annotations
 import argparse
+import json
+import os
 import re
 import sys
-from typing import Dict, Set, Tuple, List
-from urllib.parse import urlparse, urlunparse
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple, List
+from urllib.parse import urlparse, urlunparse, unquote, parse_qs
 
 from gpt_wiki_translator.config import get_settings
-from gpt_wiki_translator.mediawiki_client import MediaWikiClient
+from gpt_wiki_translator.mediawiki_client import MediaWikiClient, get_client
 from gpt_wiki_translator.logging_utils import get_logger
 
 logger = get_logger()
 
-# Cache for interwiki prefixes per endpoint
+# Collapses the blank-line runs left behind once old interwiki markers are removed
+_COLLAPSE_BLANKS_RE = re.compile(r"\n{3,}")
+
+# Cache for interwiki prefixes per endpoint (filled by concurrent link workers, snapshotted by
+# save_state: every access goes through _prefixes_lock)
 _interwiki_prefixes_cache: Dict[str, Set[str]] = {}
+_prefixes_lock = threading.Lock()
+# Cache for compiled interwiki patterns per endpoint (derived from the prefixes above)
+_interwiki_pattern_cache: Dict[str, re.Pattern] = {}
+
+# Concurrency limits (MediaWiki etiquette: keep the number of parallel requests small)
+SEED_WORKERS = 4          # clusters built in parallel
+LINK_WORKERS = 8          # pages checked/edited in parallel
+PER_ENDPOINT_REQUESTS = 2 # simultaneous page syncs against the same wiki
+_endpoint_semaphores: Dict[str, threading.Semaphore] = {}
+_semaphores_lock = threading.Lock()
+
+# Clients (HTTP session + login) are shared per endpoint through mediawiki_client.get_client
+
+def _endpoint_semaphore(endpoint: str) -> threading.Semaphore:
+    with _semaphores_lock:
+        return _endpoint_semaphores.setdefault(endpoint, threading.Semaphore(PER_ENDPOINT_REQUESTS))
+
+def reset_caches() -> None:
+    """Clear per-endpoint caches (clients, interwiki prefixes and compiled patterns together)."""
+    get_client.cache_clear()
+    with _prefixes_lock:
+        _interwiki_prefixes_cache.clear()
+    _interwiki_pattern_cache.clear()
+
+# Sidecar file (next to the CSV log) used to resume interrupted sync runs
+STATE_FILENAME = '.sync_state.json'
+# Cluster progress is written every STATE_SAVE_EVERY clusters or STATE_SAVE_INTERVAL seconds
+# (each save rewrites the whole file), and once more when the run stops
+STATE_SAVE_EVERY = 50
+STATE_SAVE_INTERVAL = 30.0
+
+def _state_path() -> Path:
+    return Path(get_settings().log_csv_path).parent / STATE_FILENAME
+
+def load_state() -> Dict[str, Any]:
+    """Load persisted sync state and seed the interwiki prefix cache from it.
+    State layout: {'interwiki_prefixes': {endpoint: [prefix]}, 'processed_clusters': {endpoint: [[[lang, title]]]}}
+    """
+    state: Dict[str, Any] = {'interwiki_prefixes': {}, 'processed_clusters': {}}
+    path = _state_path()
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            state['interwiki_prefixes'].update(data.get('interwiki_prefixes', {}))
+            state['processed_clusters'].update(data.get('processed_clusters', {}))
+        except (OSError, ValueError) as e:
+            logger.warning('Ignoring unreadable sync state %s: %s', path, e)
+    with _prefixes_lock:
+        for ep, prefixes in state['interwiki_prefixes'].items():
+            _interwiki_prefixes_cache.setdefault(ep, set(prefixes))
+    return state
+
+def save_state(state: Dict[str, Any]) -> None:
+    """Atomically write sync state (current interwiki prefix cache included)."""
+    with _prefixes_lock:
+        snapshot = dict(_interwiki_prefixes_cache)
+    state['interwiki_prefixes'] = {ep: sorted(prefixes) for ep, prefixes in snapshot.items()}
+    path = _state_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, path)
+
+def reset_state() -> None:
+    """Delete persisted sync state."""
+    _state_path().unlink(missing_ok=True)
 
 def get_valid_interwiki_prefixes(client: MediaWikiClient) -> Set[str]:
     """Fetch valid interwiki prefixes from MediaWiki API.
     Returns only prefixes whose URLs contain 'tripleperformance'.
     Results are cached per endpoint.
     """
-    if client.endpoint in _interwiki_prefixes_cache:
-        return _interwiki_prefixes_cache[client.endpoint]
+    with _prefixes_lock:
+        cached = _interwiki_prefixes_cache.get(client.endpoint)
+    if cached is not None:
+        return cached
     
     params = {
         'action': 'query',
@@ -61,19 +144,31 @@ def get_valid_interwiki_prefixes(client: MediaWikiClient) -> Set[str]:
         if 'tripleperformance' in url.lower() and prefix:
             prefixes.add(prefix)
     
-    _interwiki_prefixes_cache[client.endpoint] = prefixes
+    with _prefixes_lock:
+        prefixes = _interwiki_prefixes_cache.setdefault(client.endpoint, prefixes)
     logger.debug('Loaded %d interwiki prefixes for %s: %s', len(prefixes), client.endpoint, ', '.join(sorted(prefixes)))
     return prefixes
 
 def get_interwiki_pattern(client: MediaWikiClient) -> re.Pattern:
-    """Build regex pattern matching only valid interwiki links for this endpoint."""
+    """Build regex pattern matching only valid interwiki links for this endpoint.
+    Results are cached per endpoint.
+    """
+    if client.endpoint in _interwiki_pattern_cache:
+        return _interwiki_pattern_cache[client.endpoint]
+    
     prefixes = get_valid_interwiki_prefixes(client)
     if not prefixes:
         # Fallback to empty pattern that matches nothing
-        return re.compile(r'(?!.*)')
-    # Build pattern: [[prefix:Page]] or [[:prefix:Page]]
-    prefix_group = '|'.join(re.escape(p) for p in prefixes)
-    return re.compile(rf"\[\[:?({prefix_group}):([^\]]+)\]\]")
+        pattern = re.compile(r'(?!.*)')
+    else:
+        # Build pattern: [[prefix:Page]] or [[:prefix:Page]]
+        # Longest prefixes first so that e.g. 'en-gb' is never shadowed by 'en'
+        escaped = sorted((re.escape(p) for p in prefixes), key=len, reverse=True)
+        prefix_group = '|'.join(escaped)
+        pattern = re.compile(rf"\[\[:?({prefix_group}):([^\]]+)\]\]")
+    
+    _interwiki_pattern_cache[client.endpoint] = pattern
+    return pattern
 
 def parse_mediawiki_url(url: str) -> Tuple[str, str]:
     """Parse MediaWiki page URL and return (api_endpoint, page_title).
@@ -84,29 +179,25 @@ def parse_mediawiki_url(url: str) -> Tuple[str, str]:
       https://en.example.org/w/index.php?title=Main_Page
         -> ('https://en.example.org/w/api.php', 'Main_Page')
     """
-    import urllib.parse
     parsed = urlparse(url)
+    path = parsed.path
     
-    # Extract title from URL
-    if '/wiki/' in parsed.path:
-        # Format: /wiki/Page_Title
-        title = parsed.path.split('/wiki/', 1)[1]
+    if '/wiki/' in path:
+        # Common format: /wiki/Page_Title -> /api.php next to /wiki/
+        api_path = path.rsplit('/wiki/', 1)[0] + '/api.php'
         # Decode URL encoding (e.g., %C3%A9 -> é)
-        title = urllib.parse.unquote(title)
-    elif 'title=' in parsed.query:
-        # Format: /w/index.php?title=Page_Title
-        query_params = urllib.parse.parse_qs(parsed.query)
-        title = query_params.get('title', [''])[0]
-    else:
+        title = unquote(path.split('/wiki/', 1)[1])
+        return urlunparse((parsed.scheme, parsed.netloc, api_path, '', '', '')), title
+    
+    if 'title=' not in parsed.query:
         raise ValueError(f"Cannot extract page title from URL: {url}")
+    # Format: /w/index.php?title=Page_Title
+    title = parse_qs(parsed.query).get('title', [''])[0]
     
     # Build API endpoint
-    if '/wiki/' in parsed.path:
-        # Replace /wiki/ with /api.php
-        api_path = parsed.path.rsplit('/wiki/', 1)[0] + '/api.php'
-    elif '/w/index.php' in parsed.path:
+    if '/w/index.php' in path:
         # Replace /w/index.php with /w/api.php
-        api_path = parsed.path.replace('/index.php', '/api.php')
+        api_path = path.replace('/index.php', '/api.php')
     else:
         # Default: assume /api.php at root
         api_path = '/api.php'
@@ -171,13 +262,11 @@ def fetch_pages_with_langlinks(client: MediaWikiClient, limit: int | None, from_
     return titles
 
 
-def get_langlinks_map(client: MediaWikiClient, title: str) -> Dict[str, str]:
-    return client.get_langlinks(title)
-
-
 def build_cluster(seed_title: str, seed_lang: str, seed_client: MediaWikiClient) -> Dict[str, str]:
     """Build a raw translation cluster mapping lang -> page title by exploring langlinks.
     Resolves redirects to final target pages.
+    Explores one level at a time so that all titles of a level living on the same wiki
+    are looked up in a single multi-title request.
     """
     # Resolve seed page if it's a redirect
     resolved_seed = seed_client.resolve_redirect(seed_title)
@@ -187,56 +276,68 @@ def build_cluster(seed_title: str, seed_lang: str, seed_client: MediaWikiClient)
     seed_title = resolved_seed
     
     cluster: Dict[str, str] = {seed_lang: seed_title}
-    to_visit: List[Tuple[str, str]] = [(seed_lang, seed_title)]
+    # FIFO of pages to explore; every entry has already been resolved when it was discovered
+    to_visit: deque[Tuple[str, str]] = deque([(seed_lang, seed_title)])
     visited: Set[Tuple[str, str]] = set()
     while to_visit:
-        lang, title = to_visit.pop()
-        if (lang, title) in visited:
-            continue
-        visited.add((lang, title))
-        if lang == seed_lang:
-            client = seed_client
-        else:
-            ep = derive_endpoint_for_lang(seed_client.endpoint, lang)
-            client = MediaWikiClient(ep, verify_ssl=seed_client.verify_ssl)
+        # Drain exactly the current level; newly discovered pages form the next one
+        titles_by_lang: Dict[str, List[str]] = {}
+        for _ in range(len(to_visit)):
+            lang, title = to_visit.popleft()
+            if (lang, title) in visited:
+                continue
+            visited.add((lang, title))
+            titles_by_lang.setdefault(lang, []).append(title)
         
-        # Resolve redirect if needed
-        resolved_title = client.resolve_redirect(title)
-        if not resolved_title:
-            logger.warning('Page %s:%s does not exist, skipping', lang, title)
-            continue
-        if resolved_title != title:
-            logger.info('Resolved redirect %s:%s -> %s', lang, title, resolved_title)
-            title = resolved_title
-            cluster[lang] = title  # Update cluster with resolved title
+        # Collect langlinks of the whole level, one request batch per wiki
+        discovered: Dict[str, str] = {}
+        for lang, titles in titles_by_lang.items():
+            if lang == seed_lang:
+                client = seed_client
+            else:
+                ep = derive_endpoint_for_lang(seed_client.endpoint, lang)
+                client = get_client(ep, verify_ssl=seed_client.verify_ssl)
+            links_by_title = client.get_langlinks_bulk(titles)
+            for title in titles:
+                for llang, ltitle in links_by_title.get(title, {}).items():
+                    if llang not in cluster and llang not in discovered:
+                        discovered[llang] = ltitle
         
-        links = get_langlinks_map(client, title)
-        for llang, ltitle in links.items():
-            if llang not in cluster:
-                # Resolve redirect for discovered langlink
-                llang_ep = derive_endpoint_for_lang(seed_client.endpoint, llang)
-                llang_client = MediaWikiClient(llang_ep, verify_ssl=seed_client.verify_ssl)
-                resolved_ltitle = llang_client.resolve_redirect(ltitle)
-                if not resolved_ltitle:
-                    logger.warning('Langlink target %s:%s does not exist, skipping', llang, ltitle)
-                    continue
-                if resolved_ltitle != ltitle:
-                    logger.info('Resolved redirect %s:%s -> %s', llang, ltitle, resolved_ltitle)
-                    ltitle = resolved_ltitle
-                cluster[llang] = ltitle
-                to_visit.append((llang, ltitle))
+        # Resolve redirects for discovered langlinks and queue them as the next level
+        for llang, ltitle in discovered.items():
+            llang_ep = derive_endpoint_for_lang(seed_client.endpoint, llang)
+            llang_client = get_client(llang_ep, verify_ssl=seed_client.verify_ssl)
+            resolved_ltitle = llang_client.resolve_redirects_bulk([ltitle]).get(ltitle)
+            if not resolved_ltitle:
+                logger.warning('Langlink target %s:%s does not exist, skipping', llang, ltitle)
+                continue
+            if resolved_ltitle != ltitle:
+                logger.info('Resolved redirect %s:%s -> %s', llang, ltitle, resolved_ltitle)
+            cluster[llang] = resolved_ltitle
+            to_visit.append((llang, resolved_ltitle))
     return cluster
 
 def filter_existing_pages(seed_client: MediaWikiClient, endpoint: str, cluster: Dict[str, str]) -> Dict[str, str]:
     """Return subset of cluster retaining only pages that actually exist on their language wiki.
     Resolves redirects to final target pages and updates cluster with resolved titles.
+    Issues one multi-title request per endpoint.
     """
-    existing: Dict[str, str] = {}
+    titles_by_ep: Dict[str, List[Tuple[str, str]]] = {}
     for lang, title in cluster.items():
         ep = derive_endpoint_for_lang(endpoint, lang)
-        client = MediaWikiClient(ep, verify_ssl=seed_client.verify_ssl)
-        # Resolve redirect to final page (returns None if page doesn't exist)
-        resolved_title = client.resolve_redirect(title)
+        titles_by_ep.setdefault(ep, []).append((lang, title))
+    
+    resolved_by_lang: Dict[str, str | None] = {}
+    for ep, entries in titles_by_ep.items():
+        client = get_client(ep, verify_ssl=seed_client.verify_ssl)
+        # Resolve redirects to final pages (None if page doesn't exist)
+        resolved = client.resolve_redirects_bulk([title for _, title in entries])
+        for lang, title in entries:
+            resolved_by_lang[lang] = resolved.get(title)
+    
+    existing: Dict[str, str] = {}
+    for lang, title in cluster.items():
+        resolved_title = resolved_by_lang.get(lang)
         if resolved_title:
             if resolved_title != title:
                 logger.info('Resolved redirect %s:%s -> %s', lang, title, resolved_title)
@@ -260,11 +361,20 @@ def ensure_links_on_page(client: MediaWikiClient, title: str, required: Dict[str
     Skip modification if all required links already exist with correct targets.
     Returns True if an edit is performed.
     """
-    content = client.fetch_page_wikitext(title) or ''
-    existing = parse_existing_interwiki(content, client)  # lang -> ptitle
-
     # Build expected mapping excluding self language
     expected = {lang: ptitle for lang, ptitle in required.items() if lang != self_lang}
+
+    # Cheap check first: the langlinks known to the API, without downloading the page text.
+    # Reads feeding an edit skip the HTTP cache (MEDIAWIKI_CACHE_DIR)
+    api_langlinks = client.get_langlinks(title, fresh=True)
+    if {lang: ptitle for lang, ptitle in api_langlinks.items() if lang != self_lang} == expected:
+        logger.info('Skip %s (interwiki set complete)', title)
+        return False
+
+    # Something is missing or extra: the page text decides (langlinks table may lag behind edits)
+    content = client.fetch_page_wikitext(title, fresh=True) or ''
+    existing = parse_existing_interwiki(content, client)  # lang -> ptitle
+
     # Filter existing excluding self
     existing_filtered = {lang: ptitle for lang, ptitle in existing.items() if lang != self_lang}
 
@@ -280,7 +390,10 @@ def ensure_links_on_page(client: MediaWikiClient, title: str, required: Dict[str
     # Remove old interwiki markers (any language) then append new block
     interwiki_pattern = get_interwiki_pattern(client)
     cleaned = interwiki_pattern.sub('', content)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned).rstrip()
+    # Markers removed mid-page can leave blank-line runs; only pay for the regex when one exists
+    if '\n\n\n' in cleaned:
+        cleaned = _COLLAPSE_BLANKS_RE.sub("\n\n", cleaned)
+    cleaned = cleaned.rstrip()
     new_content = cleaned + ('\n' if not cleaned.endswith('\n') else '') + unified_block + '\n'
 
     if dry_run:
@@ -293,9 +406,33 @@ def ensure_links_on_page(client: MediaWikiClient, title: str, required: Dict[str
         return True
 
 
+def _ensure_links_limited(client: MediaWikiClient, title: str, required: Dict[str, str], self_lang: str, dry_run: bool) -> bool:
+    """ensure_links_on_page throttled by the per-endpoint semaphore."""
+    with _endpoint_semaphore(client.endpoint):
+        return ensure_links_on_page(client, title, required, self_lang, dry_run)
+
+
+def sync_cluster_pages(pages: Dict[str, str], existing_cluster: Dict[str, str], endpoint: str, verify_ssl: bool,
+                       dry_run: bool, executor: ThreadPoolExecutor) -> int:
+    """Ensure the interwiki block on every page of a cluster in parallel.
+    Returns the number of pages modified."""
+    futures = []
+    for lang, title in pages.items():
+        ep = derive_endpoint_for_lang(endpoint, lang)
+        client = get_client(ep, verify_ssl=verify_ssl)
+        # Use existing_cluster so that non-existent targets are removed
+        futures.append(executor.submit(_ensure_links_limited, client, title, existing_cluster, lang, dry_run))
+    return sum(1 for f in futures if f.result())
+
+
 def sync(endpoint: str, dry_run: bool, limit: int | None, from_page: str | None = None):
+    """Synchronize all clusters reachable from pages with langlinks on this endpoint.
+    Completed clusters are persisted periodically and when the run stops (never in dry-run) so an
+    interrupted run can be resumed; the progress is dropped once the run completes.
+    """
     settings = get_settings()
-    seed_client = MediaWikiClient(endpoint, verify_ssl=not endpoint.startswith('https://') or '.dev.' not in endpoint)
+    state = load_state()
+    seed_client = get_client(endpoint, verify_ssl=not endpoint.startswith('https://') or '.dev.' not in endpoint)
     page_titles = fetch_pages_with_langlinks(seed_client, limit, from_page)
     
     if from_page:
@@ -303,27 +440,56 @@ def sync(endpoint: str, dry_run: bool, limit: int | None, from_page: str | None
     else:
         logger.info('Found %d seed pages with langlinks', len(page_titles))
     
-    processed_clusters: Set[frozenset] = set()
-    total_pages_touched = 0
-
-    for seed_title in page_titles:
-        cluster = build_cluster(seed_title, settings.source_language if hasattr(settings, 'source_language') else endpoint.split('//')[1].split('.')[0], seed_client)
-        signature = frozenset(f"{lang}:{title}" for lang, title in cluster.items())
-        if signature in processed_clusters:
-            continue
-        processed_clusters.add(signature)
-        logger.info('Cluster for %s: %s', seed_title, ', '.join(f"{l}:{t}" for l,t in cluster.items()))
-        # For each page ensure interwiki block
-        # Remove links whose target pages do not exist
-        existing_cluster = filter_existing_pages(seed_client, endpoint, cluster)
-        for lang, title in cluster.items():
-            ep = derive_endpoint_for_lang(endpoint, lang)
-            client = MediaWikiClient(ep, verify_ssl=seed_client.verify_ssl)
-            # Use existing_cluster so that non-existent targets are removed
-            changed = ensure_links_on_page(client, title, existing_cluster, lang, dry_run)
-            if changed:
-                total_pages_touched += 1
+    seed_lang = settings.source_language if hasattr(settings, 'source_language') else endpoint.split('//')[1].split('.')[0]
+    done_clusters: List[List[List[str]]] = state['processed_clusters'].setdefault(endpoint, [])
+    processed_clusters: Set[Tuple[Tuple[str, str], ...]] = {tuple(tuple(pair) for pair in sig) for sig in done_clusters}
+    if processed_clusters:
+        logger.info('Resuming: %d clusters already processed in a previous run', len(processed_clusters))
+    processed_lock = threading.Lock()
+    unsaved = {'clusters': 0, 'since': time.monotonic()}
+
+    with ThreadPoolExecutor(max_workers=LINK_WORKERS) as link_executor:
+        def process_seed(seed_title: str) -> int:
+            cluster = build_cluster(seed_title, seed_lang, seed_client)
+            # One tuple per cluster instead of N formatted strings + a frozenset
+            signature = tuple(sorted(cluster.items()))
+            with processed_lock:
+                if signature in processed_clusters:
+                    return 0
+                processed_clusters.add(signature)
+            logger.info('Cluster for %s: %s', seed_title, ', '.join(f"{l}:{t}" for l,t in cluster.items()))
+            # For each page ensure interwiki block
+            # Remove links whose target pages do not exist
+            existing_cluster = filter_existing_pages(seed_client, endpoint, cluster)
+            touched = sync_cluster_pages(cluster, existing_cluster, endpoint, seed_client.verify_ssl, dry_run, link_executor)
+            if not dry_run:
+                with processed_lock:
+                    done_clusters.append([list(pair) for pair in signature])
+                    unsaved['clusters'] += 1
+                    if unsaved['clusters'] >= STATE_SAVE_EVERY or time.monotonic() - unsaved['since'] >= STATE_SAVE_INTERVAL:
+                        save_state(state)
+                        unsaved.update(clusters=0, since=time.monotonic())
+            return touched
 
+        total_pages_touched = 0
+        with ThreadPoolExecutor(max_workers=SEED_WORKERS) as seed_executor:
+            futures = [seed_executor.submit(process_seed, title) for title in page_titles]
+            try:
+                for future in as_completed(futures):
+                    total_pages_touched += future.result()
+            except BaseException:
+                # First failure stops the run: drop queued seeds, only let running ones finish
+                seed_executor.shutdown(cancel_futures=True)
+                if not dry_run:
+                    # Keep the clusters finished so far for the next run
+                    with processed_lock:
+                        save_state(state)
+                raise
+
+    # Run completed: keep the prefix cache but forget cluster progress
+    state['processed_clusters'].pop(endpoint, None)
+    if not dry_run:
+        save_state(state)
     logger.info('Synchronization complete. Pages modified: %d', total_pages_touched)
 
 
@@ -334,6 +500,7 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Do not perform edits, only report actions')
     parser.add_argument('--limit', type=int, help='Limit number of seed pages processed (only when using --endpoint)')
     parser.add_argument('--from', dest='from_page', help='Resume from this page title (only when using --endpoint)')
+    parser.add_argument('--reset-state', action='store_true', help=f'Discard persisted sync state ({STATE_FILENAME}: interwiki prefixes, processed clusters) before running')
     args = parser.parse_args()
     
     if args.page and args.endpoint:
@@ -341,24 +508,27 @@ def main():
     if not args.page and not args.endpoint:
         parser.error('Must specify either --page (URL) or --endpoint (API endpoint).')
     
+    if args.reset_state:
+        reset_state()
+        logger.info('Sync state reset')
+    
     if args.page:
         # Single page mode: derive endpoint and title from URL
         endpoint, page_title = parse_mediawiki_url(args.page)
         logger.info('Single page mode: %s (endpoint: %s)', page_title, endpoint)
         settings = get_settings()
-        seed_client = MediaWikiClient(endpoint, verify_ssl=not endpoint.startswith('https://') or '.dev.' not in endpoint)
+        # Reuse (and extend) the persisted interwiki prefixes, like the batch mode does
+        state = load_state()
+        seed_client = get_client(endpoint, verify_ssl=not endpoint.startswith('https://') or '.dev.' not in endpoint)
         # Extract language from endpoint (first subdomain)
         lang = endpoint.split('//')[1].split('.')[0]
         cluster = build_cluster(page_title, lang, seed_client)
         logger.info('Cluster for %s: %s', page_title, ', '.join(f"{l}:{t}" for l,t in cluster.items()))
         existing_cluster = filter_existing_pages(seed_client, endpoint, cluster)
-        total_pages_touched = 0
-        for lang, title in existing_cluster.items():
-            ep = derive_endpoint_for_lang(endpoint, lang)
-            client = MediaWikiClient(ep, verify_ssl=seed_client.verify_ssl)
-            changed = ensure_links_on_page(client, title, existing_cluster, lang, args.dry_run)
-            if changed:
-                total_pages_touched += 1
+        with ThreadPoolExecutor(max_workers=LINK_WORKERS) as link_executor:
+            total_pages_touched = sync_cluster_pages(existing_cluster, existing_cluster, endpoint, seed_client.verify_ssl, args.dry_run, link_executor)
+        if not args.dry_run:
+            save_state(state)
         logger.info('Synchronization complete. Pages modified: %d', total_pages_touched)
     else:
         # Batch mode: iterate all pages with langlinks
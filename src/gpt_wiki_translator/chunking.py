@@ -1,38 +1,112 @@
 """Intelligent chunking of wikitext by sections with token estimation."""
 from __future__ import annotations
 import re
-from typing import List, Tuple
+import threading
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterator, List, Sequence, Tuple
+from .wikitext_parser import fast_template_spans
+
+# Seconds before retrying a tiktoken encoding that failed to load (e.g. BPE download offline)
+ENCODER_RETRY_INTERVAL = 60.0
+_encoders: dict = {}
+_encoder_failures: dict = {}
+_encoder_lock = threading.Lock()
+
+def _get_encoder(name: str = "cl100k_base"):
+    """Load a tiktoken encoding once per process (BPE tables are costly to load).
+    Returns None when tiktoken is not installed or its BPE file cannot be fetched; only a
+    successful load is kept, a failed one is retried after ENCODER_RETRY_INTERVAL."""
+    encoder = _encoders.get(name)
+    if encoder is not None:
+        return encoder
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    with _encoder_lock:
+        if name in _encoders:
+            return _encoders[name]
+        failed_at = _encoder_failures.get(name)
+        if failed_at is not None and time.monotonic() - failed_at < ENCODER_RETRY_INTERVAL:
+            return None
+        try:
+            _encoders[name] = tiktoken.get_encoding(name)
+        except Exception as e:
+            _encoder_failures[name] = time.monotonic()
+            from .logging_utils import get_logger
+            get_logger().warning('tiktoken encoding %s unavailable (%s); estimating 1 token per 3 chars', name, e)
+            return None
+        _encoder_failures.pop(name, None)
+        return _encoders[name]
 
-# Simple token estimation (1 token ≈ 4 characters for most languages)
 def estimate_tokens(text: str) -> int:
-    """Rough estimate of token count. Conservative: 1 token per 3.5 chars."""
-    return len(text) // 3
+    """Count tokens with tiktoken's cl100k_base encoding.
+    Falls back to a conservative 1 token per 3 chars when the encoding is unavailable
+    (not memoized, so exact counts resume once the encoding loads)."""
+    encoder = _get_encoder()
+    if encoder is None:
+        return len(text) // 3
+    return _count_tokens(text)
+
+@lru_cache(maxsize=4096)
+def _count_tokens(text: str) -> int:
+    """Memoized: sections and chunks are counted several times during chunking and stats."""
+    return len(_get_encoder().encode(text, disallowed_special=()))
+
+# Pattern to match wiki headings: ==+ Title ==+
+_HEADING_RE = re.compile(r'^(={2,6})\s*(.+?)\s*\1\s*$', re.MULTILINE)
+# Paragraph separator; matched left to right without overlap, exactly like str.split('\n\n')
+_PARA_SEP_RE = re.compile(r'\n\n')
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Equivalent of text[start:end].strip() expressed as adjusted offsets."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
-def split_by_sections(wikitext: str) -> List[Tuple[str, str]]:
+def _paragraph_spans(text: str, start: int, end: int,
+                     protected: Sequence[Tuple[int, int]] = ()) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) spans of text[start:end].split('\\n\\n') without building the substrings.
+    Separators falling inside a protected (start, end) span, e.g. a multi-line template, are kept."""
+    starts = [s for s, _ in protected]
+    prev = start
+    for m in _PARA_SEP_RE.finditer(text, start, end):
+        i = bisect_right(starts, m.start()) - 1
+        if i >= 0 and m.start() < protected[i][1]:
+            continue
+        yield prev, m.start()
+        prev = m.end()
+    yield prev, end
+
+def split_by_sections(wikitext: str) -> List[Tuple[str, int, int]]:
     """Split wikitext into sections based on == headings ==.
-    Returns list of (heading, content) tuples."""
-    # Pattern to match wiki headings: ==+ Title ==+
-    heading_pattern = re.compile(r'^(={2,6})\s*(.+?)\s*\1\s*$', re.MULTILINE)
+    Returns list of (heading, start, end) tuples where wikitext[start:end] is the
+    stripped section content, so no intermediate substrings are materialized."""
+    # Fast path: a heading must start a line with '==', so without one there is nothing to split
+    if '\n==' not in wikitext and not wikitext.startswith('=='):
+        return [("", *_strip_span(wikitext, 0, len(wikitext)))]
     
-    sections: List[Tuple[str, str]] = []
+    sections: List[Tuple[str, int, int]] = []
     last_end = 0
     last_heading = ""
     
-    for match in heading_pattern.finditer(wikitext):
+    for match in _HEADING_RE.finditer(wikitext):
         # Content between last heading and this one
-        content = wikitext[last_end:match.start()].strip()
-        if content or last_heading:
-            sections.append((last_heading, content))
+        start, end = _strip_span(wikitext, last_end, match.start())
+        if start < end or last_heading:
+            sections.append((last_heading, start, end))
         
         # New heading
-        level = len(match.group(1))
-        title = match.group(2).strip()
         last_heading = match.group(0)  # Full heading with ==
         last_end = match.end()
     
     # Last section
-    content = wikitext[last_end:].strip()
-    sections.append((last_heading, content))
+    start, end = _strip_span(wikitext, last_end, len(wikitext))
+    sections.append((last_heading, start, end))
     
     return sections
 
@@ -51,72 +125,114 @@ def create_chunks(wikitext: str, max_tokens: int = 7000) -> List[str]:
     if not sections:
         return [wikitext]
     
+    def render(parts: List[Tuple[str, int, int]]) -> str:
+        # Sections are only turned into strings when their chunk is emitted, and the
+        # pieces are joined once (no per-section f-string copy)
+        pieces: List[str] = []
+        for part_heading, part_start, part_end in parts:
+            if pieces:
+                pieces.append('\n\n')
+            if part_heading:
+                pieces.append(part_heading)
+                pieces.append('\n')
+            pieces.append(wikitext[part_start:part_end])
+        return ''.join(pieces)
+    
+    def render_paras(parts: List[Tuple[int, int]], with_heading: str) -> str:
+        body = '\n\n'.join(wikitext[s:e] for s, e in parts)
+        return f"{with_heading}\n{body}" if with_heading else body
+    
     chunks: List[str] = []
-    current_chunk_parts: List[str] = []
+    current_chunk_parts: List[Tuple[str, int, int]] = []
     current_tokens = 0
+    # Computed lazily, only oversized sections are split by paragraph
+    template_spans: List[Tuple[int, int]] | None = None
     
-    for heading, content in sections:
-        section_text = f"{heading}\n{content}" if heading else content
-        section_tokens = estimate_tokens(section_text)
+    for heading, start, end in sections:
+        content = wikitext[start:end]
+        section_tokens = estimate_tokens(f"{heading}\n{content}" if heading else content)
         
         # If single section exceeds max, we need to split it further
         if section_tokens > max_tokens:
             # Save current chunk if any
             if current_chunk_parts:
-                chunks.append('\n\n'.join(current_chunk_parts))
+                chunks.append(render(current_chunk_parts))
                 current_chunk_parts = []
                 current_tokens = 0
             
-            # Split large section by paragraphs
-            paragraphs = content.split('\n\n')
-            para_chunk_parts: List[str] = [heading] if heading else []
-            para_tokens = estimate_tokens(heading) if heading else 0
+            # Split large section by paragraphs, tracked as (start, end) spans.
+            # The heading is emitted once, in front of the first paragraph group.
+            # Never split inside a template: its parameters may contain blank lines
+            if template_spans is None:
+                template_spans = fast_template_spans(wikitext)
+            heading_tokens = estimate_tokens(heading) if heading else 0
+            pending_heading = heading
+            para_chunk_parts: List[Tuple[int, int]] = []
+            para_tokens = heading_tokens
             
-            for para in paragraphs:
-                para_tokens_est = estimate_tokens(para)
+            for para_start, para_end in _paragraph_spans(wikitext, start, end, template_spans):
+                para_tokens_est = estimate_tokens(wikitext[para_start:para_end])
                 
-                if para_tokens + para_tokens_est > max_tokens:
-                    if para_chunk_parts:
-                        chunks.append('\n\n'.join(para_chunk_parts))
-                    # Very large paragraph - split by sentences or just include as-is
-                    if para_tokens_est > max_tokens:
-                        # Force include even if over limit
-                        chunks.append(f"{heading}\n{para}" if heading else para)
-                    else:
-                        para_chunk_parts = [para]
-                        para_tokens = para_tokens_est
-                else:
-                    para_chunk_parts.append(para)
+                if para_tokens + para_tokens_est <= max_tokens:
+                    para_chunk_parts.append((para_start, para_end))
                     para_tokens += para_tokens_est
+                    continue
+                
+                # Paragraph doesn't fit: emit the current group and start a new one with it
+                if para_chunk_parts:
+                    chunks.append(render_paras(para_chunk_parts, pending_heading))
+                    pending_heading = ""
+                para_chunk_parts = [(para_start, para_end)]
+                para_tokens = (heading_tokens if pending_heading else 0) + para_tokens_est
+                
+                # Very large paragraph - include as-is even if over limit
+                if para_tokens_est > max_tokens:
+                    chunks.append(render_paras(para_chunk_parts, pending_heading))
+                    pending_heading = ""
+                    para_chunk_parts = []
+                    para_tokens = 0
             
-            if para_chunk_parts:
-                chunks.append('\n\n'.join(para_chunk_parts))
+            if para_chunk_parts or pending_heading:
+                chunks.append(render_paras(para_chunk_parts, pending_heading))
         
         # Normal case: section fits in current or new chunk
         elif current_tokens + section_tokens > max_tokens:
             # Save current chunk and start new one
             if current_chunk_parts:
-                chunks.append('\n\n'.join(current_chunk_parts))
-            current_chunk_parts = [section_text]
+                chunks.append(render(current_chunk_parts))
+            current_chunk_parts = [(heading, start, end)]
             current_tokens = section_tokens
         else:
             # Add to current chunk
-            current_chunk_parts.append(section_text)
+            current_chunk_parts.append((heading, start, end))
             current_tokens += section_tokens
     
     # Don't forget last chunk
     if current_chunk_parts:
-        chunks.append('\n\n'.join(current_chunk_parts))
+        chunks.append(render(current_chunk_parts))
     
     return chunks if chunks else [wikitext]
 
 def get_chunk_stats(chunks: List[str]) -> dict:
-    """Get statistics about chunks."""
+    """Get statistics about chunks (single pass, one token count per chunk)."""
+    total_chars = 0
+    total_tokens = 0
+    min_tokens = 0
+    max_tokens = 0
+    for i, chunk in enumerate(chunks):
+        tokens = estimate_tokens(chunk)
+        total_chars += len(chunk)
+        total_tokens += tokens
+        if i == 0 or tokens < min_tokens:
+            min_tokens = tokens
+        if tokens > max_tokens:
+            max_tokens = tokens
+    count = len(chunks)
     return {
-        'count': len(chunks),
-        'total_chars': sum(len(c) for c in chunks),
-        'total_tokens_est': sum(estimate_tokens(c) for c in chunks),
-        'avg_tokens': sum(estimate_tokens(c) for c in chunks) // len(chunks) if chunks else 0,
-        'max_tokens': max(estimate_tokens(c) for c in chunks) if chunks else 0,
-        'min_tokens': min(estimate_tokens(c) for c in chunks) if chunks else 0,
+        'count': count,
+        'total_chars': total_chars,
+        'total_tokens_est': total_tokens,
+        'avg_tokens': total_tokens // count if count else 0,
+        'max_tokens': max_tokens,
+        'min_tokens': min_tokens,
     }
@@ -1,7 +1,9 @@
 import argparse
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlparse, unquote
-from .translation_pipeline import TranslationPipeline
+from .translation_pipeline import TranslationPipeline, BatchTranslationPipeline
+from .mediawiki_client import get_client
 from .config import get_settings
 
 def parse_args() -> argparse.Namespace:
@@ -12,6 +14,8 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--dry-run', action='store_true', help='Do not publish translated pages, just simulate')
     p.add_argument('--force', action='store_true', help='Force retranslation even if target page already exists')
     p.add_argument('--no-verify-ssl', action='store_true', help='Disable SSL certificate verification (useful for dev environments)')
+    p.add_argument('--batch', action='store_true', help='Translate all chunks through the OpenAI Batch API (cheaper; waits up to BATCH_MAX_WAIT_HOURS, then translates the rest live)')
+    p.add_argument('--strict-validate', action='store_true', help='Always run the LLM validator, even when local brace/template/link checks pass')
     args = p.parse_args()
     
     # Validate that either --input or --page is provided
@@ -22,6 +26,7 @@ def parse_args() -> argparse.Namespace:
     
     return args
 
+@lru_cache(maxsize=256)
 def swap_lang_in_host(host: str, target_lang: str) -> str:
     """Replace only the language subdomain (first part) while preserving .dev. or prod segments.
     Examples:
@@ -33,6 +38,25 @@ def swap_lang_in_host(host: str, target_lang: str) -> str:
         parts[0] = target_lang
     return '.'.join(parts)
 
+@lru_cache(maxsize=32)
+def _endpoint_parts(endpoint: str) -> tuple[str, str, str, str]:
+    """Return (scheme, netloc, path, lang) for an API endpoint URL."""
+    u = urlparse(endpoint)
+    return u.scheme, u.netloc, u.path, u.netloc.split('.', 1)[0]
+
+def _fast_parse_wiki_url(line: str) -> tuple[str, str, str] | None:
+    """Split the common https://<lang>.<host>/wiki/<title> shape without urlparse.
+    Returns (scheme, netloc, title), or None when the line needs full URL parsing."""
+    if '?' in line or '#' in line:
+        return None
+    scheme, sep, rest = line.partition('://')
+    if not sep:
+        return None
+    netloc, _, path = rest.partition('/')
+    if not path.startswith('wiki/'):
+        return None
+    return scheme, netloc, unquote(path[5:])
+
 def derive_endpoints_and_title(line: str, target_lang: str, default_endpoint: str | None) -> tuple[str, str, str, str]:
     """Return (source_endpoint, target_endpoint, title, source_lang) for a line.
     If line is URL, derive endpoints from URL host (assume /api.php).
@@ -41,63 +65,67 @@ def derive_endpoints_and_title(line: str, target_lang: str, default_endpoint: st
     """
     line = line.strip()
     if line.startswith('http'):
-        u = urlparse(line)
-        # title
-        if '/wiki/' in u.path:
-            title = unquote(u.path.split('/wiki/', 1)[1])
+        parsed = _fast_parse_wiki_url(line)
+        if parsed is not None:
+            scheme, netloc, title = parsed
         else:
-            title = unquote(u.path.lstrip('/'))
-        source_endpoint = f"{u.scheme}://{u.netloc}/api.php"
-        target_host = swap_lang_in_host(u.netloc, target_lang)
-        target_endpoint = f"{u.scheme}://{target_host}/api.php"
-        source_lang = u.netloc.split('.', 1)[0]
+            u = urlparse(line)
+            scheme, netloc = u.scheme, u.netloc
+            # title
+            if '/wiki/' in u.path:
+                title = unquote(u.path.split('/wiki/', 1)[1])
+            else:
+                title = unquote(u.path.lstrip('/'))
+        source_endpoint = f"{scheme}://{netloc}/api.php"
+        target_host = swap_lang_in_host(netloc, target_lang)
+        target_endpoint = f"{scheme}://{target_host}/api.php"
+        source_lang = netloc.split('.', 1)[0]
         return source_endpoint, target_endpoint, title, source_lang
     else:
         if not default_endpoint:
             raise ValueError('A default MEDIAWIKI_API_ENDPOINT must be set in .env for non-URL lines')
-        # Extract host to compute target
-        u = urlparse(default_endpoint)
+        # Extract host to compute target (parsed once per run, the default endpoint is constant)
+        scheme, netloc, path, source_lang = _endpoint_parts(default_endpoint)
         title = line
         source_endpoint = default_endpoint
-        target_host = swap_lang_in_host(u.netloc, target_lang)
-        target_endpoint = f"{u.scheme}://{target_host}{u.path}"
-        source_lang = u.netloc.split('.', 1)[0]
+        target_host = swap_lang_in_host(netloc, target_lang)
+        target_endpoint = f"{scheme}://{target_host}{path}"
         return source_endpoint, target_endpoint, title, source_lang
 
 def main():
     args = parse_args()
     settings = get_settings()
-    # Build list of (source_endpoint, target_endpoint, title, source_lang)
-    entries: list[tuple[str, str, str, str]] = []
+    # Group titles by (source_endpoint, target_endpoint, source_lang) so each group shares one pipeline;
+    # each group is an ordered set (dict keys) so duplicate input lines are processed only once
+    from collections import defaultdict
+    groups: dict[tuple[str, str, str], dict[str, None]] = defaultdict(dict)
     
     if args.page:
         # Single page mode
         source_ep, target_ep, title, source_lang = derive_endpoints_and_title(args.page, args.target_lang, settings.mediawiki_api_endpoint)
-        entries.append((source_ep, target_ep, title, source_lang))
+        groups[(source_ep, target_ep, source_lang)][title] = None
     else:
-        # Batch mode from file
+        # Batch mode from file, streamed line by line
         p = Path(args.input)
-        for raw in p.read_text(encoding='utf-8').splitlines():
-            raw = raw.strip()
-            if not raw or raw.startswith('#'):
-                continue
-            source_ep, target_ep, title, source_lang = derive_endpoints_and_title(raw, args.target_lang, settings.mediawiki_api_endpoint)
-            entries.append((source_ep, target_ep, title, source_lang))
-
-    # Group by source/target endpoints to reuse clients per batch for efficiency
-    from collections import defaultdict
-    groups: dict[tuple[str, str, str], list[str]] = defaultdict(list)  # (source_ep, target_ep, source_lang) -> titles
-    for source_ep, target_ep, title, source_lang in entries:
-        groups[(source_ep, target_ep, source_lang)].append(title)
+        with p.open('r', encoding='utf-8') as fh:
+            for raw in fh:
+                raw = raw.strip()
+                if not raw or raw.startswith('#'):
+                    continue
+                source_ep, target_ep, title, source_lang = derive_endpoints_and_title(raw, args.target_lang, settings.mediawiki_api_endpoint)
+                groups[(source_ep, target_ep, source_lang)][title] = None
 
     for (source_ep, target_ep, source_lang), titles in groups.items():
         # Auto-detect dev environment and disable SSL verification if requested or if .dev. is in endpoint
         verify_ssl = not args.no_verify_ssl and '.dev.' not in source_ep
-        pipeline = TranslationPipeline(
+        # Clients are shared by endpoint so each wiki gets a single session + login for the run
+        pipeline_cls = BatchTranslationPipeline if args.batch else TranslationPipeline
+        pipeline = pipeline_cls(
             source_ep, target_ep, source_lang, args.target_lang, 
-            dry_run=args.dry_run, force=args.force, verify_ssl=verify_ssl
+            dry_run=args.dry_run, force=args.force, verify_ssl=verify_ssl, strict_validate=args.strict_validate,
+            source_mw=get_client(source_ep, verify_ssl), target_mw=get_client(target_ep, verify_ssl)
         )
-        pipeline.process_pages(titles)
+        pipeline.process_pages(list(titles))
 
 if __name__ == '__main__':
     main()
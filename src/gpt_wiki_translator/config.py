@@ -11,7 +11,21 @@ class Settings(BaseSettings):
     mediawiki_password: str | None = Field(default=None, alias='MEDIAWIKI_PASSWORD')
     max_tokens_per_chunk: int = Field(1800, alias='MAX_TOKENS_PER_CHUNK')
     temperature: float = Field(0.2, alias='TEMPERATURE')
+    # Limites OpenAI appliquées côté client (0 = pas de limite)
+    openai_max_requests_per_minute: int = Field(500, alias='OPENAI_MAX_REQUESTS_PER_MINUTE')
+    openai_max_tokens_per_minute: int = Field(200000, alias='OPENAI_MAX_TOKENS_PER_MINUTE')
     log_csv_path: str = Field('logs/translated_log.csv', alias='LOG_CSV_PATH')
+    # Nombre de pages traitées en parallèle (appels MediaWiki/OpenAI, I/O-bound)
+    page_workers: int = Field(8, alias='PAGE_WORKERS')
+    # Nombre de chunks d'une même page traduits en parallèle
+    chunk_workers: int = Field(4, alias='CHUNK_WORKERS')
+    # Dossier du cache HTTP (requests-cache) pour les GET MediaWiki; désactivé si vide
+    mediawiki_cache_dir: str | None = Field(default=None, alias='MEDIAWIKI_CACHE_DIR')
+    # Cache persistant des traductions (sqlite, ex: ~/.cache/gpt_wiki_translator/translations.sqlite);
+    # désactivé si vide = cache en mémoire uniquement
+    translation_cache_path: str | None = Field(default=None, alias='TRANSLATION_CACHE_PATH')
+    # Attente maximale d'un job Batch API (--batch); au-delà il est annulé et les chunks traduits en direct
+    batch_max_wait_hours: float = Field(6.0, alias='BATCH_MAX_WAIT_HOURS')
 
     class Config:
         env_file = '.env'
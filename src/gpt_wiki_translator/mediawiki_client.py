@@ -1,21 +1,94 @@
 from __future__ import annotations
 import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Any
+try:
+    # orjson parses large revision/langlinks payloads several times faster than json
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover - optional dependency
+    from json import loads as _loads
+from . import __version__
 from .config import get_settings
 from .logging_utils import get_logger
 
 logger = get_logger()
 
+# MediaWiki accepts at most 50 titles per query for regular users
+TITLES_PER_QUERY = 50
+
+# Throttling / transient server errors worth another attempt
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_TOTAL = 5
+RETRY_BACKOFF = 0.3
+
+# Interwiki marker: [[en:Page]] or [[:en:Page]]
+_MARKER_RE = re.compile(r"\[\[:?([a-zA-Z-]+):([^\]]+)\]\]")
+
+@lru_cache(maxsize=64)
+def _lang_link_re(lang: str) -> re.Pattern:
+    """Pattern matching any existing interwiki link for the given language."""
+    return re.compile(rf"\[\[:?{re.escape(lang)}:[^\]]+\]\]")
+
+def _batched(titles: list[str], size: int = TITLES_PER_QUERY):
+    for i in range(0, len(titles), size):
+        yield titles[i:i + size]
+
+def _is_cacheable(response: requests.Response) -> bool:
+    # Login/CSRF tokens are session-bound and must always be fetched fresh
+    return 'meta=tokens' not in (response.request.url or '')
+
+def _make_session(cache_dir: str | None) -> requests.Session:
+    """Plain Session, or an on-disk requests-cache CachedSession for GETs when cache_dir is set."""
+    if not cache_dir:
+        return requests.Session()
+    try:
+        import requests_cache
+    except ImportError:
+        logger.warning('MEDIAWIKI_CACHE_DIR is set but requests-cache is not installed; caching disabled')
+        return requests.Session()
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    return requests_cache.CachedSession(
+        cache_name=str(Path(cache_dir) / 'mediawiki_http_cache'),
+        backend='sqlite',
+        allowable_methods=('GET',),
+        expire_after=3600,
+        filter_fn=_is_cacheable,
+    )
+
 class MediaWikiClient:
     def __init__(self, endpoint: str, verify_ssl: bool = True):
         self.settings = get_settings()
         if not endpoint:
             raise ValueError('MediaWiki endpoint is required')
         self.endpoint = endpoint
-        self.session = requests.Session()
+        self.session = _make_session(self.settings.mediawiki_cache_dir)
+        self._http_cached = hasattr(self.session, 'cache')
+        # Keep-alive pool large enough for concurrent callers sharing this client,
+        # with transport-level retries on throttling / transient server errors.
+        # GET only: a POST (edit, single-use login token) may already be applied when a 5xx or
+        # read timeout comes back; read-only POST queries and edits retry in _post_json/_post_edit
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(['GET']),
+            ),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = f'gpt_wiki_translator/{__version__}'
         self.verify_ssl = verify_ssl
         self._csrf_token: str | None = None
+        self._token_lock = threading.Lock()
         
         # Disable SSL warnings if verification is disabled
         if not verify_ssl:
@@ -30,86 +103,160 @@ class MediaWikiClient:
             except Exception as e:
                 logger.warning('Login failed on %s: %s', endpoint, e)
 
-    def _get_token(self) -> str:
-        if self._csrf_token:
-            return self._csrf_token
-        params = {
-            'action': 'query',
-            'meta': 'tokens',
-            'format': 'json'
-        }
-        r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl)
+    def _get_json(self, params: dict[str, str], fresh: bool = False) -> dict[str, Any]:
+        """fresh=True bypasses (and refreshes) the HTTP cache: for reads whose result feeds an edit."""
+        kwargs = {'force_refresh': True} if fresh and self._http_cached else {}
+        r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl, **kwargs)
         r.raise_for_status()
-        data = r.json()
-        token = data['query']['tokens']['csrftoken']
-        self._csrf_token = token
-        return token
+        # Decode the raw bytes: MediaWiki always answers UTF-8, no charset detection needed
+        return _loads(r.content)
+
+    def _post(self, data: dict[str, str], retry_statuses: tuple[int, ...] = ()) -> requests.Response:
+        """POST, retried with backoff (or Retry-After) only on the given statuses."""
+        for attempt in range(RETRY_TOTAL + 1):
+            r = self.session.post(self.endpoint, data=data, timeout=30, verify=self.verify_ssl)
+            if r.status_code not in retry_statuses or attempt == RETRY_TOTAL:
+                return r
+            try:
+                delay = float(r.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                delay = RETRY_BACKOFF * 2 ** attempt
+            time.sleep(delay)
+        return r
+
+    def _post_json(self, data: dict[str, str]) -> dict[str, Any]:
+        # action=query POSTs are plain reads: safe to repeat, unlike login
+        r = self._post(data, RETRY_STATUSES if data.get('action') == 'query' else ())
+        r.raise_for_status()
+        return _loads(r.content)
+
+    def _get_token(self) -> str:
+        # Lock-free fast path once the token is cached; threads sharing this client
+        # then double-check under the lock so only one of them fetches it
+        token = self._csrf_token
+        if token:
+            return token
+        with self._token_lock:
+            token = self._csrf_token
+            if token:
+                return token
+            params = {
+                'action': 'query',
+                'meta': 'tokens',
+                'format': 'json'
+            }
+            data = self._get_json(params)
+            token = data['query']['tokens']['csrftoken']
+            self._csrf_token = token
+            return token
 
     def login(self, username: str, password: str) -> None:
         # Obtain login token
-        r = self.session.get(self.endpoint, params={
+        login_token = self._get_json({
             'action': 'query', 'meta': 'tokens', 'type': 'login', 'format': 'json'
-        }, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        login_token = r.json()['query']['tokens']['logintoken']
+        })['query']['tokens']['logintoken']
         # Legacy action=login
-        r2 = self.session.post(self.endpoint, data={
+        data = self._post_json({
             'action': 'login', 'lgname': username, 'lgpassword': password,
             'lgtoken': login_token, 'format': 'json'
-        }, timeout=30, verify=self.verify_ssl)
-        r2.raise_for_status()
-        data = r2.json()
+        })
         if data.get('login', {}).get('result') != 'Success':
             raise RuntimeError(f"Login failed: {data}")
+        # Prefetch the CSRF token on the authenticated session so the first edit is a single POST
+        self._csrf_token = None
+        self._get_token()
 
-    def fetch_page_wikitext(self, title: str) -> str | None:
+    def fetch_page_bundle(self, title: str, resolve_redirects: bool = True, with_content: bool = True,
+                          fresh: bool = False) -> dict[str, Any]:
+        """Existence, redirect status and (optionally) wikitext of a page in a single query.
+        fresh=True skips the HTTP cache (see _get_json).
+
+        Returns a dict with keys:
+            - exists: whether the (final, if resolving redirects) page exists
+            - is_redirect: whether the requested title is a redirect
+            - redirect_target: final target title when resolving redirects, else None
+            - title: final target if a redirect was followed, else the requested title
+            - wikitext: page content, or None if missing or with_content=False
+        """
         params = {
             'action': 'query',
-            'prop': 'revisions',
-            'rvslots': 'main',
-            'rvprop': 'content',
+            'prop': 'info|revisions' if with_content else 'info',
             'titles': title,
             'format': 'json'
         }
-        r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        data = r.json()
-        pages = data.get('query', {}).get('pages', {})
-        for page in pages.values():
+        if with_content:
+            params.update({'rvslots': 'main', 'rvprop': 'content'})
+        if resolve_redirects:
+            params['redirects'] = '1'
+        query = self._get_json(params, fresh=fresh).get('query', {})
+        redirects = query.get('redirects', [])
+        bundle: dict[str, Any] = {
+            'exists': False,
+            'is_redirect': bool(redirects),
+            # Final target (last in chain)
+            'redirect_target': redirects[-1]['to'] if redirects else None,
+            'title': redirects[-1]['to'] if redirects else title,
+            'wikitext': None,
+        }
+        page = next(iter(query.get('pages', {}).values()), None)
+        if page is not None:
+            # MediaWiki flags missing/invalid titles explicitly, no need to parse the page id
+            bundle['exists'] = 'missing' not in page and 'invalid' not in page
+            if not resolve_redirects:
+                bundle['is_redirect'] = 'redirect' in page
             if 'revisions' in page:
-                return page['revisions'][0]['slots']['main']['*']
-        return None
+                bundle['wikitext'] = page['revisions'][0]['slots']['main']['*']
+        return bundle
 
-    def page_exists(self, title: str) -> bool:
-        """Check if a page exists."""
-        params = {
-            'action': 'query',
-            'titles': title,
-            'format': 'json'
-        }
-        r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        data = r.json()
-        pages = data.get('query', {}).get('pages', {})
-        for page_id, page in pages.items():
-            # If page_id is negative, the page doesn't exist
-            return int(page_id) > 0
-        return False
+    def fetch_page_wikitext(self, title: str, fresh: bool = False) -> str | None:
+        return self.fetch_page_bundle(title, resolve_redirects=False, fresh=fresh)['wikitext']
+
+    def fetch_page_wikitext_bulk(self, titles: list[str]) -> dict[str, str | None]:
+        """Fetch wikitext for many titles at once (up to 50 per request).
+        Returns a mapping requested title -> wikitext (None if the page is missing)."""
+        results: dict[str, str | None] = {}
+        unique_titles = list(dict.fromkeys(t for t in titles if t))
+        for batch in _batched(unique_titles):
+            by_page_title: dict[str, str | None] = {}
+            normalized: dict[str, str] = {}
+            continue_params = {}
+            while True:
+                data = {
+                    'action': 'query',
+                    'prop': 'revisions',
+                    'rvslots': 'main',
+                    'rvprop': 'content',
+                    'titles': '|'.join(batch),
+                    'format': 'json'
+                }
+                # Large pages may be spread over several responses (rvcontinue)
+                data.update(continue_params)
+                resp = self._post_json(data)
+                query = resp.get('query', {})
+                for n in query.get('normalized', []):
+                    normalized[n['from']] = n['to']
+                for page in query.get('pages', {}).values():
+                    if 'revisions' in page:
+                        by_page_title[page.get('title', '')] = page['revisions'][0]['slots']['main']['*']
+                continue_params = resp.get('continue', {})
+                if not continue_params:
+                    break
+            for title in batch:
+                results[title] = by_page_title.get(normalized.get(title, title))
+        return results
+
+    def page_exists(self, title: str, resolve_redirects: bool = False, fresh: bool = False) -> tuple[bool, str]:
+        """Check if a page exists.
+
+        Returns (exists, title) where title is the final redirect target when
+        resolve_redirects is set and the page is a redirect, else the requested title.
+        """
+        bundle = self.fetch_page_bundle(title, resolve_redirects=resolve_redirects, with_content=False, fresh=fresh)
+        return bundle['exists'], bundle['title']
 
     def is_redirect(self, title: str) -> bool:
         """Check if a page is a redirect."""
-        params = {
-            'action': 'query',
-            'titles': title,
-            'format': 'json'
-        }
-        r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        data = r.json()
-        pages = data.get('query', {}).get('pages', {})
-        for page in pages.values():
-            return 'redirect' in page
-        return False
+        return self.fetch_page_bundle(title, resolve_redirects=False, with_content=False)['is_redirect']
 
     def resolve_redirect(self, title: str) -> str | None:
         """Resolve a redirect to its final target page.
@@ -119,33 +266,46 @@ class MediaWikiClient:
             - Original title if not a redirect and page exists
             - None if page doesn't exist (or redirect target doesn't exist)
         """
-        params = {
-            'action': 'query',
-            'titles': title,
-            'redirects': '1',
-            'format': 'json'
-        }
-        r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        data = r.json()
-        
-        # Check if page exists by looking at the pages dict
-        pages = data.get('query', {}).get('pages', {})
-        for page_id, page in pages.items():
-            # If page has 'missing' key or negative ID, page doesn't exist
-            if 'missing' in page or int(page_id) < 0:
-                return None
-            # Page exists, check if there was a redirect
-            redirects = data.get('query', {}).get('redirects', [])
-            if redirects:
-                # Return the final target (last in chain)
-                return redirects[-1]['to']
-            # No redirect, return original title
-            return title
-        
-        return None
+        bundle = self.fetch_page_bundle(title, resolve_redirects=True, with_content=False)
+        return bundle['title'] if bundle['exists'] else None
+
+    def resolve_redirects_bulk(self, titles: list[str]) -> dict[str, str | None]:
+        """Resolve many titles at once (up to 50 per request, multi-value titles=A|B|C).
 
-    def get_langlinks(self, title: str) -> dict[str, str]:
+        Returns a mapping requested title -> same value as resolve_redirect() would return:
+        final target title, original title if not a redirect, or None if the page doesn't exist.
+        """
+        results: dict[str, str | None] = {}
+        unique_titles = list(dict.fromkeys(t for t in titles if t))
+        for batch in _batched(unique_titles):
+            data = {
+                'action': 'query',
+                'titles': '|'.join(batch),
+                'redirects': '1',
+                'format': 'json'
+            }
+            # POST keeps long title lists clear of URL length limits
+            query = self._post_json(data).get('query', {})
+            normalized = {n['from']: n['to'] for n in query.get('normalized', [])}
+            redirects = {rd['from']: rd['to'] for rd in query.get('redirects', [])}
+            existing = {
+                page['title'] for page in query.get('pages', {}).values()
+                if 'missing' not in page and 'invalid' not in page
+            }
+            for title in batch:
+                current = normalized.get(title, title)
+                seen: set[str] = set()
+                while current in redirects and current not in seen:
+                    seen.add(current)
+                    current = redirects[current]
+                if current not in existing:
+                    results[title] = None
+                else:
+                    results[title] = current if seen else title
+        return results
+
+    def get_langlinks(self, title: str, fresh: bool = False) -> dict[str, str]:
+        """fresh=True bypasses the HTTP cache (see _get_json)."""
         langlinks: dict[str, str] = {}
         continue_params = {}
         
@@ -160,9 +320,7 @@ class MediaWikiClient:
             # Add continuation parameters from previous response
             params.update(continue_params)
             
-            r = self.session.get(self.endpoint, params=params, timeout=30, verify=self.verify_ssl)
-            r.raise_for_status()
-            data = r.json()
+            data = self._get_json(params, fresh=fresh)
             pages = data.get('query', {}).get('pages', {})
             for page in pages.values():
                 for ll in page.get('langlinks', []) or []:
@@ -175,25 +333,71 @@ class MediaWikiClient:
                 
         return langlinks
 
+    def get_langlinks_bulk(self, titles: list[str]) -> dict[str, dict[str, str]]:
+        """Fetch langlinks for many titles at once (up to 50 per request).
+        Returns a mapping requested title -> {lang: title} (empty dict if none or missing)."""
+        results: dict[str, dict[str, str]] = {}
+        unique_titles = list(dict.fromkeys(t for t in titles if t))
+        for batch in _batched(unique_titles):
+            by_page_title: dict[str, dict[str, str]] = {}
+            normalized: dict[str, str] = {}
+            continue_params = {}
+            while True:
+                data = {
+                    'action': 'query',
+                    'titles': '|'.join(batch),
+                    'prop': 'langlinks',
+                    'lllimit': 'max',
+                    'format': 'json'
+                }
+                # Add continuation parameters from previous response
+                data.update(continue_params)
+                resp = self._post_json(data)
+                query = resp.get('query', {})
+                for n in query.get('normalized', []):
+                    normalized[n['from']] = n['to']
+                for page in query.get('pages', {}).values():
+                    links = by_page_title.setdefault(page.get('title', ''), {})
+                    for ll in page.get('langlinks', []) or []:
+                        links[ll['lang']] = ll['*']
+                continue_params = resp.get('continue', {})
+                if not continue_params:
+                    break
+            for title in batch:
+                results[title] = by_page_title.get(normalized.get(title, title), {})
+        return results
+
+    def _post_edit(self, data: dict[str, str]) -> dict[str, Any]:
+        """POST an edit with the cached CSRF token; a rejected token is dropped and refetched once,
+        a throttled (429) edit is retried after Retry-After."""
+        for attempt in range(2):
+            data['token'] = self._get_token()
+            # Only 429 is retried: a throttled edit was not applied, a 5xx one may have been
+            r = self._post(data, (429,))
+            if r.status_code in (401, 403):
+                self._csrf_token = None
+            r.raise_for_status()
+            resp = _loads(r.content)
+            if resp.get('error', {}).get('code') == 'badtoken' and attempt == 0:
+                self._csrf_token = None
+                continue
+            return resp
+        return resp
+
     def create_or_update_page(self, title: str, wikitext: str, summary: str = 'Automated translation') -> dict[str, Any]:
-        token = self._get_token()
         data = {
             'action': 'edit',
             'title': title,
             'text': wikitext,
             'format': 'json',
             'minor': '1',
-            'token': token,
             'summary': summary,
             'watchlist': 'nochange'
         }
-        r = self.session.post(self.endpoint, data=data, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        return r.json()
+        return self._post_edit(data)
 
     def create_or_update_json_page(self, title: str, json_text: str, summary: str = 'Automated JSON translation') -> dict[str, Any]:
         """Create or update a JSON content page. Uses appropriate content model if supported."""
-        token = self._get_token()
         data = {
             'action': 'edit',
             'title': title,
@@ -202,33 +406,48 @@ class MediaWikiClient:
             'contentmodel': 'json',
             'minor': '1',
             'contentformat': 'application/json',
-            'token': token,
             'summary': summary,
             'watchlist': 'nochange'
         }
-        r = self.session.post(self.endpoint, data=data, timeout=30, verify=self.verify_ssl)
-        r.raise_for_status()
-        return r.json()
+        return self._post_edit(data)
 
     def add_or_update_interwiki_link(self, title: str, interwiki_marker: str, summary: str = 'Add interwiki link') -> dict[str, Any]:
-        # Fetch current
-        content = self.fetch_page_wikitext(title) or ''
-        # If exact marker already present, skip
-        if interwiki_marker in content:
-            return {'skip': True, 'reason': 'already present'}
+        # Fetch current (never from the HTTP cache: the edit below rewrites this exact text)
+        content = self.fetch_page_wikitext(title, fresh=True) or ''
 
         # Try to detect the language from the marker and replace any existing link for that language
         # Accept both forms [[en:Page]] and [[:en:Page]]
-        m = re.match(r"\[\[:?([a-zA-Z-]+):([^\]]+)\]\]", interwiki_marker)
+        m = _MARKER_RE.match(interwiki_marker)
         if m:
             lang = m.group(1)
-            # Pattern to find any existing interwiki link for the same language
-            pattern = re.compile(rf"\[\[:?{re.escape(lang)}:[^\]]+\]\]")
-            if pattern.search(content):
-                new_content = pattern.sub(interwiki_marker, content, count=1)
+            # Single scan for any existing interwiki link for the same language
+            existing = _lang_link_re(lang).search(content)
+            if existing:
+                # If exact marker already present, skip
+                if existing.group(0) == interwiki_marker or interwiki_marker in content[existing.end():]:
+                    return {'skip': True, 'reason': 'already present'}
+                new_content = content[:existing.start()] + interwiki_marker + content[existing.end():]
                 return self.create_or_update_page(title, new_content, summary=summary)
+        elif interwiki_marker in content:
+            return {'skip': True, 'reason': 'already present'}
 
         # Otherwise, append at the end
         sep = "\n" if not content.endswith("\n") else ""
         new_content = content + f"{sep}{interwiki_marker}\n"
         return self.create_or_update_page(title, new_content, summary=summary)
+
+
+@lru_cache(maxsize=None)
+def _shared_client(endpoint: str, verify_ssl: bool) -> MediaWikiClient:
+    return MediaWikiClient(endpoint, verify_ssl=verify_ssl)
+
+# lru_cache alone lets two threads miss at the same time and log in twice
+_client_lock = threading.Lock()
+
+def get_client(endpoint: str, verify_ssl: bool = True) -> MediaWikiClient:
+    """Shared MediaWikiClient per (endpoint, verify_ssl): one HTTP session and one login per wiki.
+    Thread-safe; get_client.cache_clear() drops every shared client."""
+    with _client_lock:
+        return _shared_client(endpoint, verify_ssl)
+
+get_client.cache_clear = _shared_client.cache_clear  # type: ignore[attr-defined]
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 # Mapping des préfixes de namespace FR -> EN (extensible)
 NAMESPACE_MAPPING = {
     'Catégorie': 'Category',
@@ -9,12 +11,20 @@ NAMESPACE_MAPPING = {
     'Discussion': 'Talk',
 }
 
+# Préfixes précalculés groupés par première lettre: lettre -> ((fr + ':', en + ':', longueur), ...)
+# (plusieurs namespaces peuvent partager une initiale, ex. Portail / Projet)
+_BY_FIRST: dict[str, tuple[tuple[str, str, int], ...]] = {}
+for _fr, _en in NAMESPACE_MAPPING.items():
+    _BY_FIRST[_fr[0]] = _BY_FIRST.get(_fr[0], ()) + ((_fr + ':', _en + ':', len(_fr) + 1),)
+del _fr, _en
+
+@lru_cache(maxsize=4096)
 def translate_namespace_prefix(title: str, source_lang: str, target_lang: str) -> str:
     """Si le titre commence par un namespace FR connu, le remplace par équivalent EN.
     Ne traduit pas le reste du titre. Ne modifie rien si target_lang != 'en' ou source_lang != 'fr'."""
-    if source_lang == 'fr' and target_lang == 'en':
-        for fr_prefix, en_prefix in NAMESPACE_MAPPING.items():
-            prefix_colon = fr_prefix + ':'
-            if title.startswith(prefix_colon):
-                return en_prefix + ':' + title[len(prefix_colon):]
+    if source_lang != 'fr' or target_lang != 'en':
+        return title
+    for fr_colon, en_colon, cut in _BY_FIRST.get(title[:1], ()):
+        if title.startswith(fr_colon):
+            return en_colon + title[cut:]
     return title
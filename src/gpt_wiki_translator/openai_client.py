@@ -1,12 +1,151 @@
 from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
 from typing import List, Tuple
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
 from tenacity import retry, stop_after_attempt, wait_exponential
+from .chunking import estimate_tokens
 from .config import get_settings
 from .logging_utils import get_logger
 
 logger = get_logger()
 
+# Pause applied to every caller after a 429, instead of each thread retrying blindly
+RATE_LIMIT_COOLDOWN = 10.0
+
+# Batch API polling
+BATCH_POLL_INTERVAL = 30.0
+BATCH_PENDING_STATUSES = ('validating', 'in_progress', 'finalizing', 'cancelling')
+# Batch API input limits (per batch); larger inputs are split over several batches
+BATCH_MAX_REQUESTS = 50_000
+BATCH_MAX_BYTES = 200 * 1024 * 1024
+
+
+def _split_batch_lines(lines: dict[str, str], max_requests: int | None = None,
+                       max_bytes: int | None = None) -> List[List[str]]:
+    """Group JSONL request lines into batch inputs within the request count and file size limits
+    (BATCH_MAX_REQUESTS / BATCH_MAX_BYTES by default)."""
+    max_requests = max_requests or BATCH_MAX_REQUESTS
+    max_bytes = max_bytes or BATCH_MAX_BYTES
+    parts: List[List[str]] = [[]]
+    size = 0
+    for line in lines.values():
+        line_size = len(line.encode('utf-8'))
+        if parts[-1] and (len(parts[-1]) >= max_requests or size + line_size > max_bytes):
+            parts.append([])
+            size = 0
+        parts[-1].append(line)
+        size += line_size
+    return parts
+
+class RateLimiter:
+    """Thread-safe request + token buckets refilled continuously from per-minute limits.
+    A limit of 0 disables that bucket."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        self._last = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until one request and `tokens` tokens are available, then consume them."""
+        # A single oversized request only needs a full bucket
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    missing_requests = 1 - self._requests if self.rpm else 0
+                    missing_tokens = tokens - self._tokens if self.tpm else 0
+                    if missing_requests <= 0 and missing_tokens <= 0:
+                        if self.rpm:
+                            self._requests -= 1
+                        if self.tpm:
+                            self._tokens -= tokens
+                        return
+                    wait = max(
+                        missing_requests * 60 / self.rpm if missing_requests > 0 else 0,
+                        missing_tokens * 60 / self.tpm if missing_tokens > 0 else 0,
+                    )
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all callers for `seconds` (after the API reported a rate limit)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class TranslationCache:
+    """Thread-safe translation cache keyed by a hash of everything that shapes the output
+    (model, temperature, system prompt, languages, text). Kept in memory, and mirrored to
+    sqlite when a path is given so later runs reuse it."""
+
+    def __init__(self, path: str | None = None):
+        self._memory: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            db_path = Path(path).expanduser()
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            self._db.commit()
+
+    @staticmethod
+    def key(text: str, source_lang: str, target_lang: str, model: str, temperature: float, system_prompt: str) -> str:
+        raw = f"{model}\0{temperature}\0{system_prompt}\0{source_lang}\0{target_lang}\0{text}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is None and self._db is not None:
+                row = self._db.execute('SELECT value FROM translations WHERE key = ?', (key,)).fetchone()
+                if row:
+                    value = self._memory[key] = row[0]
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._memory[key] = value
+            if self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)', (key, value))
+                self._db.commit()
+
+@lru_cache(maxsize=1)
+def get_translation_cache() -> TranslationCache:
+    return TranslationCache(get_settings().translation_cache_path or None)
+
+@lru_cache(maxsize=4)
+def get_openai(api_key: str) -> OpenAI:
+    """One OpenAI SDK client per API key, so every OpenAIClient (one per pipeline) shares
+    the same HTTP connection pool and keep-alive connections."""
+    return OpenAI(api_key=api_key)
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Limits apply per API key, so every OpenAIClient shares one limiter."""
+    settings = get_settings()
+    return RateLimiter(settings.openai_max_requests_per_minute, settings.openai_max_tokens_per_minute)
+
 SYSTEM_TRANSLATE = (
     "Tu es un traducteur MediaWiki professionnel. Traduire le texte FR vers la langue cible en conservant strictement: "
     "templates (noms & paramètres non traduits), fichiers/images, fonctions parser, liens internes. "
@@ -21,22 +160,179 @@ SYSTEM_VALIDATE = (
 )
 
 class OpenAIClient:
-    def __init__(self):
+    def __init__(self, read_cache: bool = True):
+        """read_cache=False (--force) always asks the model again; results are still stored."""
         self.settings = get_settings()
-        self.client = OpenAI(api_key=self.settings.openai_api_key)
+        self.client = get_openai(self.settings.openai_api_key)
+        self.limiter = get_rate_limiter()
+        self.cache = get_translation_cache()
+        self.read_cache = read_cache
+
+    def _cache_key(self, text: str, source_lang: str, target_lang: str) -> str:
+        return self.cache.key(text, source_lang, target_lang, self.settings.openai_model, self.settings.temperature, SYSTEM_TRANSLATE)
+
+    def cache_translation(self, text: str, source_lang: str, target_lang: str, translated: str) -> None:
+        """Store a translation obtained with store=False, once the caller has validated it."""
+        if translated:
+            self.cache.set(self._cache_key(text, source_lang, target_lang), translated)
+
+    def _create(self, estimated_tokens: int, **kwargs):
+        # Reserve capacity up front; on a 429 pause everyone, tenacity then retries this call
+        self.limiter.acquire(estimated_tokens)
+        try:
+            return self.client.chat.completions.create(**kwargs)
+        except RateLimitError:
+            logger.warning('OpenAI rate limit hit, pausing requests for %.0fs', RATE_LIMIT_COOLDOWN)
+            self.limiter.pause(RATE_LIMIT_COOLDOWN)
+            raise
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
-    def translate_chunk(self, text: str, source_lang: str, target_lang: str) -> str:
+    def translate_chunk(self, text: str, source_lang: str, target_lang: str, store: bool = True) -> str:
+        """store=False leaves caching to the caller (cache_translation after validation)."""
         # logger.info('Translating chunk (%d chars)...', len(text))
-        completion = self.client.chat.completions.create(
-            model=self.settings.openai_model,
-            temperature=self.settings.temperature,
-            messages=[
+        # Same chunk / JSON page already translated (this run or a previous one)
+        if self.read_cache:
+            cached = self.cache.get(self._cache_key(text, source_lang, target_lang))
+            if cached is not None:
+                return cached
+        # Translation output is roughly as long as the input
+        completion = self._create(2 * estimate_tokens(text), **self._translate_body(text, source_lang, target_lang))
+        translated = completion.choices[0].message.content or ''
+        if store:
+            self.cache_translation(text, source_lang, target_lang, translated)
+        return translated
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
+    def translate_short_names(self, names: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translate page titles / JSON subpage names in one JSON-mode request, in input order.
+        Names the reply doesn't cover are returned unchanged."""
+        keys = [self._cache_key(f"short-name:{name}", source_lang, target_lang) for name in names]
+        result: List[str | None] = [self.cache.get(key) if self.read_cache else None for key in keys]
+        missing = list(dict.fromkeys(name for name, cached in zip(names, result) if cached is None))
+        if missing:
+            text = (
+                f"Traduire les {len(missing)} noms courts suivants (titres de pages wiki, noms de sous-pages). "
+                f"Retourne un objet JSON {{\"translations\": [...]}} contenant exactement {len(missing)} chaînes, "
+                "dans le même ordre, sans guillemets ni commentaire.\n\n" + json.dumps(missing, ensure_ascii=False)
+            )
+            translations: dict[str, str] = {}
+            try:
+                completion = self._create(
+                    2 * estimate_tokens(text),
+                    response_format={'type': 'json_object'},
+                    **self._translate_body(text, source_lang, target_lang),
+                )
+                translated = json.loads(completion.choices[0].message.content or '{}').get('translations')
+                if isinstance(translated, list) and len(translated) == len(missing) and all(isinstance(t, str) and t for t in translated):
+                    translations = dict(zip(missing, translated))
+                else:
+                    logger.warning('Short name translation returned an unexpected shape, keeping %d names', len(missing))
+            except (json.JSONDecodeError, AttributeError) as e:
+                logger.warning('Short name translation reply is not valid JSON (%s), keeping %d names', e, len(missing))
+            for i, (name, key) in enumerate(zip(names, keys)):
+                if result[i] is None:
+                    result[i] = translations.get(name, name)
+                    if name in translations:
+                        self.cache.set(key, translations[name])
+        return result
+
+    def _translate_body(self, text: str, source_lang: str, target_lang: str) -> dict:
+        """Chat completion parameters for a chunk translation (shared by live and batch calls)."""
+        return {
+            'model': self.settings.openai_model,
+            'temperature': self.settings.temperature,
+            'messages': [
                 {"role": "system", "content": SYSTEM_TRANSLATE},
                 {"role": "user", "content": f"Langue source: {source_lang}\nLangue cible: {target_lang}\n\n{text}"},
             ],
+        }
+
+    def translate_chunks_batch(self, chunks: dict[str, str], source_lang: str, target_lang: str,
+                               poll_interval: float = BATCH_POLL_INTERVAL,
+                               max_wait: float | None = None) -> dict[str, str | None]:
+        """Translate many chunks through the OpenAI Batch API (half price, completes within 24h).
+
+        chunks maps a caller-chosen custom_id -> text. The input is split into several batches
+        when it exceeds the Batch API limits (request count, file size). Blocks until every batch
+        is done, or until max_wait seconds (default BATCH_MAX_WAIT_HOURS) after which unfinished
+        batches are cancelled. Returns custom_id -> translated text (None for requests that
+        failed inside a batch or whose batch was cancelled: callers translate those live).
+        """
+        if max_wait is None:
+            max_wait = self.settings.batch_max_wait_hours * 3600
+        deadline = time.monotonic() + max_wait
+        lines = {
+            custom_id: json.dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self._translate_body(text, source_lang, target_lang),
+            }, ensure_ascii=False) + '\n'
+            for custom_id, text in chunks.items()
+        }
+        batches = [self._submit_batch(part) for part in _split_batch_lines(lines)]
+
+        results: dict[str, str | None] = {custom_id: None for custom_id in chunks}
+        while True:
+            pending = [i for i, batch in enumerate(batches) if batch.status in BATCH_PENDING_STATUSES]
+            if not pending:
+                break
+            if time.monotonic() >= deadline:
+                for i in pending:
+                    logger.warning('OpenAI batch %s still %s after %.0fs: cancelling', batches[i].id, batches[i].status, max_wait)
+                    self.client.batches.cancel(batches[i].id)
+                break
+            time.sleep(poll_interval)
+            for i in pending:
+                batches[i] = self.client.batches.retrieve(batches[i].id)
+
+        for batch in batches:
+            if batch.status in BATCH_PENDING_STATUSES:
+                continue  # cancelled above, its chunks stay None
+            if batch.status != 'completed':
+                raise RuntimeError(f'OpenAI batch {batch.id} ended with status {batch.status}')
+            if batch.output_file_id:
+                results.update(self._read_batch_file(batch.output_file_id))
+            if getattr(batch, 'error_file_id', None):
+                self._read_batch_file(batch.error_file_id)
+        return results
+
+    def _submit_batch(self, lines: List[str]):
+        """Upload one JSONL input and create its batch job."""
+        # The JSONL input is only needed for the upload: temporary file removed right after
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.jsonl', delete=False) as f:
+            input_path = Path(f.name)
+            f.writelines(lines)
+        try:
+            with input_path.open('rb') as f:
+                batch_file = self.client.files.create(file=f, purpose='batch')
+        finally:
+            input_path.unlink(missing_ok=True)
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h',
         )
-        return completion.choices[0].message.content or ''
+        logger.info('Submitted OpenAI batch %s (%d requests)', batch.id, len(lines))
+        return batch
+
+    def _read_batch_file(self, file_id: str) -> dict[str, str]:
+        """custom_id -> content of the successful requests of a batch output (or error) file;
+        failed requests are logged with their error."""
+        results: dict[str, str] = {}
+        output = self.client.files.content(file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get('response') or {}
+            if item.get('error') or response.get('status_code') != 200:
+                error = item.get('error') or response.get('body', {}).get('error') or response.get('status_code')
+                logger.warning('Batch request %s failed: %s', item.get('custom_id'), error)
+                continue
+            choices = response.get('body', {}).get('choices') or [{}]
+            results[item['custom_id']] = (choices[0].get('message') or {}).get('content') or ''
+        return results
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
     def validate_translation(self, original: str, translated: str) -> str:
@@ -44,7 +340,8 @@ class OpenAIClient:
         prompt = (
             "Original:\n" + original[:2000] + "\n---\nTraduction:\n" + translated[:2000]
         )
-        completion = self.client.chat.completions.create(
+        completion = self._create(
+            estimate_tokens(prompt) + 200,
             model=self.settings.openai_model,
             temperature=0,
             messages=[
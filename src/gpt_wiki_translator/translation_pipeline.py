@@ -1,46 +1,108 @@
 from __future__ import annotations
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
 from .config import get_settings
 from .logging_utils import get_logger
-from .mediawiki_client import MediaWikiClient
+from .mediawiki_client import MediaWikiClient, get_client, TITLES_PER_QUERY
 from .openai_client import OpenAIClient
 from .wikitext_parser import (
-    segment_wikitext,
-    merge_translated,
     count_braces,
     restore_protected_template_params,
     extract_json_template_params,
     mask_templates_for_translation,
+    count_protected_template_params,
     restore_masked_templates,
+    replace_placeholders,
 )
 from .namespace_mapping import translate_namespace_prefix
 from .chunking import create_chunks, get_chunk_stats
 import csv
+import re
+import mwparserfromhell
 import json
 from datetime import datetime, timezone
 
 logger = get_logger()
 
+# Concurrent interwiki edits on the other language wikis of a translated page
+PROPAGATION_WORKERS = 4
+
+LOG_HEADER = ['source_page','target_page','source_lang','target_lang','status','date_iso','notes']
+
+
+class _CsvLog:
+    """Append-only CSV run log: a single handle for the whole run instead of an open/close per row."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not path.exists()
+        self._fh = path.open('a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._fh)
+        # Pages are processed concurrently, possibly by several pipelines
+        self._lock = threading.Lock()
+        if write_header:
+            self.writerow(LOG_HEADER)
+
+    def writerow(self, row: List[str]):
+        with self._lock:
+            self._writer.writerow(row)
+            # Flush per row so the log survives a crash mid-run and can be tailed
+            self._fh.flush()
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
+
+
+_log_writers: dict[Path, _CsvLog] = {}
+_log_writers_lock = threading.Lock()
+
+
+def _get_log_writer(path: Path) -> _CsvLog:
+    """Shared writer for a log file, opened on first use and closed at exit."""
+    key = path.resolve()
+    with _log_writers_lock:
+        log = _log_writers.get(key)
+        if log is None:
+            log = _log_writers[key] = _CsvLog(path)
+        return log
+
+
+@atexit.register
+def _close_log_writers():
+    with _log_writers_lock:
+        for log in _log_writers.values():
+            log.close()
+        _log_writers.clear()
+
 class TranslationPipeline:
-    def __init__(self, source_endpoint: str, target_endpoint: str, source_lang: str, target_lang: str, dry_run: bool = False, force: bool = False, verify_ssl: bool = True):
+    def __init__(self, source_endpoint: str, target_endpoint: str, source_lang: str, target_lang: str, dry_run: bool = False, force: bool = False, verify_ssl: bool = True,
+                 source_mw: MediaWikiClient | None = None, target_mw: MediaWikiClient | None = None, strict_validate: bool = False,
+                 log_path: str | Path | None = None):
+        """Pre-built source_mw/target_mw clients (e.g. from get_client) can be passed to share
+        sessions and logins across pipelines; otherwise clients are created from the endpoints.
+        log_path overrides LOG_CSV_PATH for the CSV run log."""
         self.settings = get_settings()
         self.source_lang = source_lang
         self.target_lang = target_lang
         self.dry_run = dry_run
         self.force = force
         self.verify_ssl = verify_ssl
-        self.source_mw = MediaWikiClient(source_endpoint, verify_ssl=verify_ssl)
-        self.target_mw = MediaWikiClient(target_endpoint, verify_ssl=verify_ssl)
-        self.ai = OpenAIClient()
-        self.log_path = Path(self.settings.log_csv_path)
-        self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.log_path.exists():
-            with self.log_path.open('w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['source_page','target_page','source_lang','target_lang','status','date_iso','notes'])
+        self.strict_validate = strict_validate
+        self.source_mw = source_mw or MediaWikiClient(source_endpoint, verify_ssl=verify_ssl)
+        self.target_mw = target_mw or MediaWikiClient(target_endpoint, verify_ssl=verify_ssl)
+        # --force means "translate again": never serve a cached translation
+        self.ai = OpenAIClient(read_cache=not force)
+        self.log_path = Path(log_path or self.settings.log_csv_path)
+        # One append handle per CSV file, shared by every pipeline writing to it
+        self._log = _get_log_writer(self.log_path)
         # cache for other language clients
         self._other_clients: dict[str, MediaWikiClient] = {}
+        # Pages are processed concurrently; guards the client cache
+        self._lock = threading.Lock()
 
     def _derive_endpoint_for_lang(self, base_endpoint: str, lang: str) -> str:
         """Derive an endpoint for another language by replacing first subdomain segment."""
@@ -52,71 +114,175 @@ class TranslationPipeline:
         netloc = '.'.join(parts)
         return urlunparse((p.scheme, netloc, p.path, '', '', ''))
 
+    def _propagate_interwiki(self, lang: str, other_page_title: str, target_title: str):
+        """Add the target-language interwiki link on the page of another language wiki."""
+        # Get or create client (shared across pipelines for the same wiki)
+        with self._lock:
+            client = self._other_clients.get(lang)
+            if client is None:
+                ep = self._derive_endpoint_for_lang(self.source_mw.endpoint, lang)
+                client = get_client(ep, verify_ssl=self.verify_ssl)
+                self._other_clients[lang] = client
+        # Add link to English page on that language page
+        english_marker = f"[[{self.target_lang}:{target_title}]]"
+        try:
+            client.add_or_update_interwiki_link(other_page_title, english_marker, summary='Add English interwiki link')
+        except Exception as e:
+            logger.warning('Failed updating interwiki on %s:%s -> %s: %s', lang, other_page_title, target_title, e)
+
     def _append_log(self, row: List[str]):
-        with self.log_path.open('a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
-
-    def _translate_title(self, title: str) -> str:
-        """Translate page title from source language to target language.
-        Handles namespace prefixes separately."""
-        # Split namespace and actual title
-        if ':' in title:
-            parts = title.split(':', 1)
-            namespace = parts[0]
-            page_name = parts[1]
-        else:
-            namespace = None
-            page_name = title
-        
-        # Translate the namespace prefix (Catégorie -> Category, etc.)
-        if namespace:
-            translated_namespace = translate_namespace_prefix(namespace + ':', self.source_lang, self.target_lang).rstrip(':')
-        else:
-            translated_namespace = None
-        
-        # Translate the page name itself using OpenAI
+        self._log.writerow(row)
+
+    def _translate_title(self, title: str | None, subnames: Sequence[str] = ()) -> tuple[str | None, List[str]]:
+        """Translate page title from source language to target language, together with the page's
+        JSON subpage names: one translate_short_names request per page.
+        Handles namespace prefixes separately. title=None translates only the subpage names."""
+        namespace = None
+        page_name = None
+        if title is not None:
+            # Split namespace and actual title
+            if ':' in title:
+                namespace, page_name = title.split(':', 1)
+            else:
+                page_name = title
+        names = ([page_name] if page_name is not None else []) + list(subnames)
+        if not names:
+            return title, []
+
+        # Translate the page name and subpage names using OpenAI
         try:
-            prompt = f"Translate this page title from {self.source_lang} to {self.target_lang}. Return ONLY the translated title, nothing else: {page_name}"
-            translated_page_name = self.ai.translate_chunk(prompt, self.source_lang, self.target_lang).strip()
-            # Remove quotes or extra formatting if AI added them
-            translated_page_name = translated_page_name.strip('"\'')
+            translated = list(self.ai.translate_short_names(names, self.source_lang, self.target_lang))
+            if len(translated) != len(names):
+                raise ValueError(f'expected {len(names)} names, got {len(translated)}')
         except Exception as e:
-            logger.warning('Failed to translate title "%s": %s. Using original.', page_name, e)
-            translated_page_name = page_name
-        
-        # Reconstruct the full title
-        if translated_namespace:
-            return f"{translated_namespace}:{translated_page_name}"
-        else:
-            return translated_page_name
+            logger.warning('Failed to translate names %s: %s. Using originals.', names, e)
+            translated = names
+        if page_name is None:
+            return None, translated
+        translated_page_name, translated_subnames = translated[0], translated[1:]
+
+        # Translate the namespace prefix (Catégorie -> Category, etc.) and reconstruct the full title
+        if namespace:
+            translated_namespace = translate_namespace_prefix(namespace + ':', self.source_lang, self.target_lang).rstrip(':')
+            return f"{translated_namespace}:{translated_page_name}", translated_subnames
+        return translated_page_name, translated_subnames
+
+    @staticmethod
+    def _parse_source(wikitext: str | None):
+        """Parse the source once (JSON detection, masking and param restoration share the AST)
+        and list its JSON subpage references as (index, raw, subname)."""
+        if wikitext is None:
+            return None, [], []
+        parsed = mwparserfromhell.parse(wikitext)
+        json_refs = extract_json_template_params(parsed, source=wikitext)
+        # Expect pattern Base/Subpage.json
+        json_subpages = [
+            (idx, raw, raw.rsplit('/', 1)[1][:-5])  # subpage name without .json
+            for idx, raw in enumerate(json_refs)
+            if raw.lower().endswith('.json') and '/' in raw
+        ]
+        return parsed, json_refs, json_subpages
+
+    def _translate_chunk(self, chunk: str) -> str:
+        # Cached only once the whole page passes validation (see _finish_page)
+        return self.ai.translate_chunk(chunk, self.source_lang, self.target_lang, store=False)
+
+    def _translate_chunks(self, chunks: List[str]) -> List[str]:
+        workers = min(max(1, self.settings.chunk_workers), len(chunks))
+        if workers <= 1:
+            return [self._translate_chunk(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._translate_chunk, chunks))
+
+    def _prefetch_batch(self, batch: List[str]) -> tuple[dict, dict]:
+        """Multi-title lookups (titles=A|B|C) for one batch: langlinks, then wikitexts."""
+        langlinks = self.source_mw.get_langlinks_bulk(batch)
+        # Skipped pages (already translated, not forced) never need their wikitext
+        to_fetch = [t for t in batch if self.force or self.target_lang not in langlinks.get(t, {})]
+        wikitexts = self.source_mw.fetch_page_wikitext_bulk(to_fetch) if to_fetch else {}
+        return langlinks, wikitexts
 
     def process_pages(self, titles: List[str]):
-        for title in titles:
-            self.process_single_page(title.strip())
+        titles = [t.strip() for t in titles]
+        titles = [t for t in titles if t and not t.startswith('#')]
+        batches = [titles[i:i + TITLES_PER_QUERY] for i in range(0, len(titles), TITLES_PER_QUERY)]
+        if not batches:
+            return
+        # Prefetch per-title lookups one batch ahead on a background thread, so the source wiki
+        # queries for batch N+1 overlap the per-page network work (OpenAI + edits) of batch N
+        with ThreadPoolExecutor(max_workers=1) as prefetcher, \
+                ThreadPoolExecutor(max_workers=max(1, self.settings.page_workers)) as executor:
+            next_prefetch = prefetcher.submit(self._prefetch_batch, batches[0])
+            for n, batch in enumerate(batches):
+                langlinks, wikitexts = next_prefetch.result()
+                if n + 1 < len(batches):
+                    next_prefetch = prefetcher.submit(self._prefetch_batch, batches[n + 1])
+                futures = {
+                    executor.submit(
+                        self.process_single_page,
+                        title,
+                        langlinks=langlinks.get(title),
+                        wikitexts=wikitexts,
+                    ): title
+                    for title in batch
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception:
+                        logger.error('Failed processing %s', futures[future])
+                        raise
 
-    def process_single_page(self, title: str):
-        if not title or title.startswith('#'):
+    def process_single_page(self, title: str, langlinks: dict[str, str] | None = None,
+                            wikitexts: dict[str, str | None] | None = None):
+        """Translate a single page. langlinks and wikitexts may carry results prefetched
+        by process_pages; anything missing is queried individually."""
+        page = self._prepare_page(title, langlinks=langlinks, wikitexts=wikitexts)
+        if page is None:
             return
-        langlinks = self.source_mw.get_langlinks(title)
+        logger.info('Translating page: %s', title)
+        # Translate chunks concurrently (OpenAI latency-bound); map() keeps the original order
+        translated_chunks: List[str] = self._translate_chunks(page['chunks'])
+        self._finish_page(page, translated_chunks)
+
+    def _prepare_page(self, title: str, langlinks: dict[str, str] | None = None,
+                      wikitexts: dict[str, str | None] | None = None) -> dict | None:
+        """Everything before chunk translation: skip/link decisions, JSON subpages, masking, chunking.
+        Returns the state needed by _finish_page, or None if the page needs no translation."""
+        if not title or title.startswith('#'):
+            return None
+        if langlinks is None:
+            langlinks = self.source_mw.get_langlinks(title)
         if self.target_lang in langlinks and not self.force:
             logger.info('Skip %s (already translated -> %s)', title, langlinks[self.target_lang])
             date_iso = datetime.now(timezone.utc).isoformat()
             self._append_log([title, langlinks[self.target_lang], self.source_lang, self.target_lang, 'skipped', date_iso, 'already translated and present in the interwiki links'])
-            return
+            return None
         elif self.target_lang in langlinks and self.force:
             logger.info('Force mode: retranslating %s (existing: %s)', title, langlinks[self.target_lang])
         
+        # When the source text was prefetched (process_pages), its JSON subpage names are
+        # translated in the same request as the title
+        prefetched = wikitexts is not None and title in wikitexts
+        wikitext = wikitexts[title] if prefetched else None
+        parsed, json_refs, json_subpages = self._parse_source(wikitext)
+        subnames = [subname for _, _, subname in json_subpages]
+
         # Determine target title without creating duplicates:
         # If an interlanguage link already exists on the source, reuse that exact target title
         # even in --force mode to avoid creating a duplicate target page with a different title.
         if self.target_lang in langlinks:
             target_title = langlinks[self.target_lang]
+            _, translated_subnames = self._translate_title(None, subnames)
         else:
             # Otherwise, translate the title and check if such a page exists on target
-            target_title = self._translate_title(title)
+            target_title, translated_subnames = self._translate_title(title, subnames)
 
-        target_exists = self.target_mw.page_exists(target_title)
+        # In --force mode follow redirects so the final page is updated, not the redirect
+        # Fresh read: a page created since a cached answer must not be overwritten
+        target_exists, resolved_title = self.target_mw.page_exists(target_title, resolve_redirects=self.force, fresh=True)
+        if self.force and target_exists:
+            target_title = resolved_title
         
         # If target exists and --force not specified, only add interwiki link (no translation needed)
         if target_exists and not self.force:
@@ -127,36 +293,27 @@ class TranslationPipeline:
             date_iso = datetime.now(timezone.utc).isoformat()
             self._append_log([title, target_title, self.source_lang, self.target_lang, 'linked', date_iso, 'target exists - adding interwiki on the source page only'])
             logger.info('Linked %s -> %s (target exists)', title, target_title)
-            return
+            return None
         
-        wikitext = self.source_mw.fetch_page_wikitext(title)
+        if not prefetched:
+            # Lone page (process_single_page): the source is only fetched once we know it must be
+            # translated, so the title went out alone and the subpage names need their own request
+            wikitext = self.source_mw.fetch_page_wikitext(title)
+            parsed, json_refs, json_subpages = self._parse_source(wikitext)
+            if json_subpages:
+                _, translated_subnames = self._translate_title(None, [subname for _, _, subname in json_subpages])
+
         if wikitext is None:
             logger.warning('No wikitext for %s', title)
             date_iso = datetime.now(timezone.utc).isoformat()
             self._append_log([title, '', self.source_lang, self.target_lang, 'error', date_iso, 'missing wikitext'])
-            return
+            return None
 
-        # Detect JSON subpage references in templates
-        json_refs = extract_json_template_params(wikitext)
         json_replacements = {}
         json_placeholder_mapping = {}
         if json_refs:
             logger.info('Found %d JSON template references', len(json_refs))
-            for idx, raw in enumerate(json_refs):
-                # Expect pattern Base/Subpage.json
-                if not raw.lower().endswith('.json') or '/' not in raw:
-                    continue
-                base, subfile = raw.rsplit('/', 1)
-                subname = subfile[:-5]  # remove .json
-                # Translate subpage name using AI (keep .json extension)
-                try:
-                    translated_subname = self.ai.translate_chunk(
-                        f"Translate this short name for a JSON subpage from {self.source_lang} to {self.target_lang}. Return ONLY the translated name: {subname}",
-                        self.source_lang,
-                        self.target_lang
-                    ).strip().strip('"\'')
-                except Exception:
-                    translated_subname = subname
+            for (idx, raw, subname), translated_subname in zip(json_subpages, translated_subnames):
                 # Build target JSON path: target_title/translated_subname.json
                 target_json_path = f"{target_title}/{translated_subname}.json"
                 # Fetch original JSON content
@@ -171,9 +328,11 @@ class TranslationPipeline:
                         f"Translate the human-readable string VALUES inside this JSON from {self.source_lang} to {self.target_lang}. "
                         "Do not change keys, numbers, or structure. Return valid JSON only.\n\n" + orig_json_text
                     )
-                    translated_json_raw = self.ai.translate_chunk(json_translation_prompt, self.source_lang, self.target_lang)
+                    translated_json_raw = self.ai.translate_chunk(json_translation_prompt, self.source_lang, self.target_lang, store=False)
                     data_trans = pyjson.loads(translated_json_raw)
                     translated_json_text = pyjson.dumps(data_trans, ensure_ascii=False, indent=2)
+                    # Valid JSON back: worth reusing
+                    self.ai.cache_translation(json_translation_prompt, self.source_lang, self.target_lang, translated_json_raw)
                 except Exception as e:
                     logger.warning('JSON translation failed or not JSON for %s: %s (keeping original)', raw, e)
                 # Create/update JSON page on target wiki using the exact path
@@ -186,44 +345,84 @@ class TranslationPipeline:
                 json_placeholder_mapping[json_placeholder] = target_json_path
                 logger.info('JSON translation: %s -> %s', raw, target_json_path)
         
-        # Replace JSON paths in wikitext with placeholders before translation
-        wikitext_with_placeholders = wikitext
-        for original, placeholder in zip(json_refs, [f"⟪JSON_PATH_{i}⟫" for i in range(len(json_refs))]):
+        # Mask template names, parameter keys and protected values to prevent their translation
+        masked_wikitext, template_mapping, protected_params = mask_templates_for_translation(parsed)
+
+        # Replace JSON paths with placeholders before translation. Done on the masked text, where
+        # parameter values are kept verbatim, so the source AST is the only parse of the page
+        # (one regex pass; longest paths first so a path that prefixes another can't win)
+        placeholder_of: dict[str, str] = {}
+        for i, original in enumerate(json_refs):
             if original in json_replacements:
-                wikitext_with_placeholders = wikitext_with_placeholders.replace(original, placeholder)
-        
-        # Mask template names and parameter keys to prevent their translation
-        masked_wikitext, template_mapping = mask_templates_for_translation(wikitext_with_placeholders)
+                placeholder_of.setdefault(original, f"⟪JSON_PATH_{i}⟫")
+        if placeholder_of:
+            json_path_re = re.compile('|'.join(re.escape(p) for p in sorted(placeholder_of, key=len, reverse=True)))
+            masked_wikitext = json_path_re.sub(lambda m: placeholder_of[m.group(0)], masked_wikitext)
+        # Protected params the masking can't reach (templates inside tags/links) still need the
+        # AST-based restoration after translation
+        restore_params = count_protected_template_params(parsed) > len(protected_params)
 
         # Use intelligent chunking by sections on masked wikitext
         chunks = create_chunks(masked_wikitext, max_tokens=7000)
         # stats = get_chunk_stats(chunks)
-        logger.info('Translating page: %s', title)
-        
-        # Translate each chunk
-        translated_chunks: List[str] = []
-        for i, chunk in enumerate(chunks):
-            translated = self.ai.translate_chunk(chunk, self.source_lang, self.target_lang)
-            translated_chunks.append(translated)
+        return {
+            'title': title,
+            'target_title': target_title,
+            'langlinks': langlinks,
+            'wikitext': wikitext,
+            'parsed': parsed,
+            'restore_params': restore_params,
+            'template_mapping': template_mapping,
+            'protected_params': protected_params,
+            'json_placeholder_mapping': json_placeholder_mapping,
+            'chunks': chunks,
+        }
+
+    @staticmethod
+    def _validation_passed(validation: dict) -> bool:
+        checks = ('preserved_templates', 'preserved_links', 'preserved_files', 'same_brace_count')
+        return not validation.get('issues') and all(validation.get(check, False) is True for check in checks)
+
+    def _finish_page(self, page: dict, translated_chunks: List[str]):
+        """Reassemble, validate, publish and log a page prepared by _prepare_page."""
+        title = page['title']
+        target_title = page['target_title']
+        langlinks = page['langlinks']
+        wikitext = page['wikitext']
+        template_mapping = page['template_mapping']
+        json_placeholder_mapping = page['json_placeholder_mapping']
         # Reconstruct full translated wikitext
         new_wikitext_masked = '\n\n'.join(translated_chunks)
-        # Restore template names and keys
-        new_wikitext = restore_masked_templates(new_wikitext_masked, template_mapping)
-        # Restore protected template parameter values (Glyph, Icone, etc.)
-        new_wikitext = restore_protected_template_params(wikitext, new_wikitext)
+        # Restore template names, keys and protected parameter values (Glyph, Icone, etc.) in one pass
+        new_wikitext = restore_masked_templates(new_wikitext_masked, {**template_mapping, **page['protected_params']})
+        # A ⟪V_n⟫ the model dropped or altered leaves its value translated: fall back to the
+        # AST-based restoration, as for values the masking couldn't reach
+        values_lost = any(placeholder not in new_wikitext_masked for placeholder in page['protected_params'])
+        if page['restore_params'] or values_lost:
+            new_wikitext = restore_protected_template_params(page['parsed'], new_wikitext)
         # Replace JSON placeholders with translated paths
-        for placeholder, target_path in json_placeholder_mapping.items():
-            new_wikitext = new_wikitext.replace(placeholder, target_path)
+        new_wikitext = replace_placeholders(new_wikitext, json_placeholder_mapping)
         # Validation simple locale
         ob_open, ob_close = count_braces(wikitext)
         nb_open, nb_close = count_braces(new_wikitext)
-        if ob_open != nb_open or ob_close != nb_close:
+        same_braces = ob_open == nb_open and ob_close == nb_close
+        if not same_braces:
             logger.warning('Brace count mismatch for %s', title)
-        validation_raw = self.ai.validate_translation(wikitext, new_wikitext)
-        try:
-            validation = json.loads(validation_raw)
-        except json.JSONDecodeError:
-            validation = {'issues': ['invalid JSON from validator']}
+        templates_kept = all(placeholder in new_wikitext_masked for placeholder in (*template_mapping, *page['protected_params']))
+        links_kept = wikitext.count('[[') == new_wikitext.count('[[')
+        # The LLM validator is only needed when a local check fails (or with --strict-validate)
+        if same_braces and templates_kept and links_kept and not self.strict_validate:
+            validation = {'preserved_templates': True, 'preserved_links': True, 'preserved_files': True, 'same_brace_count': True, 'issues': []}
+        else:
+            validation_raw = self.ai.validate_translation(wikitext, new_wikitext)
+            try:
+                validation = json.loads(validation_raw)
+            except json.JSONDecodeError:
+                validation = {'issues': ['invalid JSON from validator']}
+        # Only translations of a page that passed validation are reused by later runs
+        if self._validation_passed(validation):
+            for chunk, translated in zip(page['chunks'], translated_chunks):
+                self.ai.cache_translation(chunk, self.source_lang, self.target_lang, translated)
         
         # Publish translated page (target_title already computed earlier)
         if not self.dry_run:
@@ -247,22 +446,17 @@ class TranslationPipeline:
             target_interwiki = f"[[{self.target_lang}:{target_title}]]"
             self.source_mw.add_or_update_interwiki_link(title, target_interwiki)
 
-            # Propagate English link to other existing language pages and add back-links to English
-            for lang, other_page_title in langlinks.items():
-                if lang in (self.source_lang, self.target_lang):
-                    continue
-                # Get or create client
-                client = self._other_clients.get(lang)
-                if client is None:
-                    ep = self._derive_endpoint_for_lang(self.source_mw.endpoint, lang)
-                    client = MediaWikiClient(ep, verify_ssl=self.verify_ssl)
-                    self._other_clients[lang] = client
-                # Add link to English page on that language page
-                english_marker = f"[[{self.target_lang}:{target_title}]]"
-                try:
-                    client.add_or_update_interwiki_link(other_page_title, english_marker, summary='Add English interwiki link')
-                except Exception as e:
-                    logger.warning('Failed updating interwiki on %s:%s -> %s: %s', lang, other_page_title, target_title, e)
+            # Propagate English link to other existing language pages and add back-links to English.
+            # Each language is a different wiki (own session), so the edits run concurrently.
+            others = [(lang, other) for lang, other in langlinks.items() if lang not in (self.source_lang, self.target_lang)]
+            if others:
+                with ThreadPoolExecutor(max_workers=min(len(others), PROPAGATION_WORKERS)) as executor:
+                    futures = [
+                        executor.submit(self._propagate_interwiki, lang, other_page_title, target_title)
+                        for lang, other_page_title in others
+                    ]
+                    for future in futures:
+                        future.result()
         else:
             publish_resp = {'dry_run': True}
         
@@ -270,3 +464,49 @@ class TranslationPipeline:
         date_iso = datetime.now(timezone.utc).isoformat()
         self._append_log([title, target_title, self.source_lang, self.target_lang, 'translated', date_iso, ';'.join(validation.get('issues', []))])
         logger.info('Translated %s -> %s (%s)', title, target_title, 'dry-run' if self.dry_run else 'published')
+
+
+class BatchTranslationPipeline(TranslationPipeline):
+    """Variant for large, non-urgent runs: the chunks of every page go into OpenAI Batch API jobs
+    (half the cost of live calls), then pages are reassembled and published."""
+
+    def process_pages(self, titles: List[str]):
+        titles = [t.strip() for t in titles]
+        titles = [t for t in titles if t and not t.startswith('#')]
+        pages: List[dict] = []
+        for i in range(0, len(titles), TITLES_PER_QUERY):
+            batch = titles[i:i + TITLES_PER_QUERY]
+            langlinks, wikitexts = self._prefetch_batch(batch)
+            for title in batch:
+                page = self._prepare_page(title, langlinks=langlinks.get(title), wikitexts=wikitexts)
+                if page is not None:
+                    pages.append(page)
+        if not pages:
+            return
+
+        # custom_id = "<page index>#<chunk index>" (titles may be long or contain odd characters)
+        batch_requests = {
+            f"{page_idx}#{chunk_idx}": chunk
+            for page_idx, page in enumerate(pages)
+            for chunk_idx, chunk in enumerate(page['chunks'])
+        }
+        logger.info('Translating %d pages (%d chunks) through the OpenAI Batch API', len(pages), len(batch_requests))
+        results = self.ai.translate_chunks_batch(batch_requests, self.source_lang, self.target_lang)
+
+        for page_idx, page in enumerate(pages):
+            translated_chunks = [results.get(f"{page_idx}#{chunk_idx}") for chunk_idx in range(len(page['chunks']))]
+            # Chunks the batch did not translate (failed request, batch cancelled past
+            # BATCH_MAX_WAIT_HOURS) go through the live path instead
+            missing = [chunk_idx for chunk_idx, chunk in enumerate(translated_chunks) if chunk is None]
+            if missing:
+                logger.warning('Batch translation incomplete for %s: translating %d chunks live', page['title'], len(missing))
+                try:
+                    live = self._translate_chunks([page['chunks'][chunk_idx] for chunk_idx in missing])
+                except Exception as e:
+                    logger.warning('Live translation failed for %s: %s', page['title'], e)
+                    date_iso = datetime.now(timezone.utc).isoformat()
+                    self._append_log([page['title'], page['target_title'], self.source_lang, self.target_lang, 'error', date_iso, 'batch translation incomplete'])
+                    continue
+                for chunk_idx, translated in zip(missing, live):
+                    translated_chunks[chunk_idx] = translated
+            self._finish_page(page, translated_chunks)
@@ -1,6 +1,9 @@
 from __future__ import annotations
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any
+import re
 import mwparserfromhell
+from mwparserfromhell.wikicode import Wikicode
 import unicodedata
 
 # Types
@@ -13,6 +16,9 @@ PROTECTED_NODE_TYPES = (
     mwparserfromhell.nodes.Wikilink,
     mwparserfromhell.nodes.ExternalLink,
 )
+# Classes concrètes (mwparserfromhell ne les sous-classe pas): un lookup au lieu de 5 isinstance
+_PROTECTED_TYPE_SET = frozenset(PROTECTED_NODE_TYPES)
+_Template = mwparserfromhell.nodes.Template
 
 # Paramètres de templates dont les valeurs ne doivent JAMAIS être traduites
 PROTECTED_TEMPLATE_PARAMS = {
@@ -31,21 +37,47 @@ PROTECTED_TEMPLATE_PARAMS = {
     'query',
 }
 
+_DIACRITIC_TABLE = str.maketrans({
+    'à': 'a', 'á': 'a', 'â': 'a', 'ä': 'a', 'ã': 'a', 'å': 'a',
+    'ç': 'c',
+    'è': 'e', 'é': 'e', 'ê': 'e', 'ë': 'e',
+    'ì': 'i', 'í': 'i', 'î': 'i', 'ï': 'i',
+    'ñ': 'n',
+    'ò': 'o', 'ó': 'o', 'ô': 'o', 'ö': 'o', 'õ': 'o',
+    'ù': 'u', 'ú': 'u', 'û': 'u', 'ü': 'u',
+    'ý': 'y', 'ÿ': 'y',
+})
+
+# Les mêmes noms (image, class, logo...) reviennent dans presque tous les templates
+@lru_cache(maxsize=4096)
 def _normalize_param_name(name: str) -> str:
     """Normalise un nom de paramètre pour comparaison (minuscule, sans accents, trim)."""
     name = name.strip().lower()
-    # Remove diacritics
-    name = ''.join(ch for ch in unicodedata.normalize('NFD', name) if unicodedata.category(ch) != 'Mn')
+    if name.isascii():
+        return name
+    # Remove diacritics: table for the usual French/Latin letters, NFD only for anything else
+    name = name.translate(_DIACRITIC_TABLE)
+    if not name.isascii():
+        name = ''.join(ch for ch in unicodedata.normalize('NFD', name) if unicodedata.category(ch) != 'Mn')
     return name
 
-def segment_wikitext(wikitext: str) -> List[Segment]:
+# Comparaison sur les noms normalisés ('bannière' et 'banniere' donnent la même entrée)
+_PROTECTED_NORMALIZED = frozenset(_normalize_param_name(p) for p in PROTECTED_TEMPLATE_PARAMS)
+
+def _as_code(wikitext: str | Wikicode) -> Wikicode:
+    """Accepte un wikitext brut ou déjà parsé, pour ne parser qu'une fois par page."""
+    if isinstance(wikitext, Wikicode):
+        return wikitext
+    return mwparserfromhell.parse(wikitext)
+
+def segment_wikitext(wikitext: str | Wikicode) -> List[Segment]:
     """Découpe le wikitext en segments textuels traduisibles et segments protégés.
     Idée: On parcourt l'AST, on stocke les nodes templates/liens comme 'protected',
     et le texte brut isolé comme 'text'."""
-    code = mwparserfromhell.parse(wikitext)
+    code = _as_code(wikitext)
     segments: List[Segment] = []
     for node in code.nodes:
-        if isinstance(node, PROTECTED_NODE_TYPES):
+        if type(node) in _PROTECTED_TYPE_SET:
             segments.append(('protected', str(node)))
         else:
             # Les autres nodes peuvent contenir du texte (ex: Text, Heading)
@@ -65,112 +97,205 @@ def merge_translated(segments: List[Segment], translated_texts: List[str]) -> st
             text_index += 1
     return ''.join(out_parts)
 
+_BRACE_TOKEN_RE = re.compile(r'\{\{|\}\}')
+
+def fast_template_spans(wikitext: str) -> List[Tuple[int, int]]:
+    """(start, end) spans of top-level {{...}} templates, found with one regex scan and a depth
+    counter instead of a full mwparserfromhell AST. Only '{{' / '}}' are scanned; an unclosed
+    template yields no span (its text is treated as plain text)."""
+    spans: List[Tuple[int, int]] = []
+    depth = 0
+    start = 0
+    for m in _BRACE_TOKEN_RE.finditer(wikitext):
+        token = m.group(0)
+        if token == '{{':
+            if depth == 0:
+                start = m.start()
+            depth += 1
+        elif token == '}}' and depth:
+            depth -= 1
+            if depth == 0:
+                spans.append((start, m.end()))
+    return spans
+
 def count_braces(wikitext: str) -> tuple[int, int]:
     return wikitext.count('{{'), wikitext.count('}}')
 
 
-def restore_protected_template_params(original_wikitext: str, translated_wikitext: str) -> str:
+def _template_keys(code: Wikicode):
+    """(template, (nom normalisé, rang parmi les templates de même nom)), dans l'ordre du document."""
+    seen: Dict[str, int] = {}
+    for tpl in code.ifilter_templates():
+        name = _normalize_param_name(str(tpl.name))
+        ordinal = seen.get(name, 0)
+        seen[name] = ordinal + 1
+        yield tpl, (name, ordinal)
+
+def restore_protected_template_params(original_wikitext: str | Wikicode, translated_wikitext: str) -> str:
     """Restaure dans le wikitext traduit les valeurs des paramètres sensibles qui ne doivent pas
     être modifiées par la traduction.
 
     Stratégie:
-    1. Parse original et collecter (template_index, normalized_param_name) -> valeur originale.
+    1. Parse original et collecter (nom du template, rang de ce nom) -> {param normalisé: valeur originale}.
     2. Parse traduit et pour chaque template/param correspondant, replacer la valeur originale.
-    On s'appuie sur l'ordre des templates pour limiter ambiguïtés (suffisant dans ce contexte).
+    La clé par nom (et non par position globale) résiste à un template perdu ou déplacé par la
+    traduction, et permet de sauter les templates sans paramètre protégé.
     """
     try:
-        orig_code = mwparserfromhell.parse(original_wikitext)
-        trans_code = mwparserfromhell.parse(translated_wikitext)
+        orig_code = _as_code(original_wikitext)
     except Exception:
         return translated_wikitext  # en cas de parsing impossible, on ne touche à rien
 
     # Collecte des valeurs originales
-    original_values: Dict[Tuple[int, str], str] = {}
-    for idx, node in enumerate(orig_code.filter_templates()):
-        if not isinstance(node, mwparserfromhell.nodes.Template):
-            continue
-        for param in node.params:
+    protected_by_tpl: Dict[Tuple[str, int], Dict[str, str]] = {}
+    for tpl, key in _template_keys(orig_code):
+        for param in tpl.params:
             norm = _normalize_param_name(str(param.name))
-            if norm in PROTECTED_TEMPLATE_PARAMS:
-                original_values[(idx, norm)] = str(param.value)
+            if norm in _PROTECTED_NORMALIZED:
+                protected_by_tpl.setdefault(key, {})[norm] = str(param.value)
 
-    if not original_values:
-        return translated_wikitext  # rien à restaurer
+    if not protected_by_tpl:
+        return translated_wikitext  # rien à restaurer: la traduction n'est même pas parsée
+
+    try:
+        trans_code = mwparserfromhell.parse(translated_wikitext)
+    except Exception:
+        return translated_wikitext
 
-    # Remplacement dans la version traduite
-    for idx, node in enumerate(trans_code.filter_templates()):
-        if not isinstance(node, mwparserfromhell.nodes.Template):
+    # Remplacement dans la version traduite; liste figée car on modifie les valeurs pendant le
+    # parcours, arrêt dès que tous les templates concernés sont passés
+    remaining = len(protected_by_tpl)
+    for tpl, key in list(_template_keys(trans_code)):
+        original_values = protected_by_tpl.get(key)
+        if original_values is None:
             continue
-        for param in node.params:
+        for param in tpl.params:
             norm = _normalize_param_name(str(param.name))
-            key = (idx, norm)
-            if key in original_values:
+            if norm in original_values:
                 # Remplacer la valeur du paramètre si différente
                 try:
-                    if str(param.value) != original_values[key]:
-                        param.value = original_values[key]
+                    if str(param.value) != original_values[norm]:
+                        param.value = original_values[norm]
                 except Exception:
                     continue
+        remaining -= 1
+        if not remaining:
+            break
 
     return str(trans_code)
 
-def extract_json_template_params(wikitext: str) -> List[str]:
+_JSON_NAME_RE = re.compile('json', re.IGNORECASE)
+
+def extract_json_template_params(wikitext: str | Wikicode, source: str | None = None) -> List[str]:
     """Return list of raw values for parameters named 'json' in any template.
-    The value usually looks like 'Page/Subpage.json'."""
+    The value usually looks like 'Page/Subpage.json'.
+    source: raw text of an already parsed `wikitext`, used for the fast 'json' check."""
+    # Texte brut sans aucun 'json': inutile de parser ou de parcourir l'AST
+    raw = wikitext if isinstance(wikitext, str) else source
+    if raw is not None and not _JSON_NAME_RE.search(raw):
+        return []
     try:
-        code = mwparserfromhell.parse(wikitext)
+        code = _as_code(wikitext)
     except Exception:
         return []
     results: List[str] = []
-    for tpl in code.filter_templates():
-        if not isinstance(tpl, mwparserfromhell.nodes.Template):
-            continue
+    for tpl in code.ifilter_templates():
         for param in tpl.params:
             norm = _normalize_param_name(str(param.name))
             if norm == 'json':
                 results.append(str(param.value).strip())
     return results
 
-def mask_templates_for_translation(wikitext: str) -> Tuple[str, Dict[str, str]]:
+def count_protected_template_params(wikitext: str | Wikicode) -> int:
+    """Nombre de paramètres protégés non vides, templates imbriqués compris (filter_templates)."""
+    code = _as_code(wikitext)
+    return sum(
+        1
+        for tpl in code.filter_templates()
+        for param in tpl.params
+        if _normalize_param_name(str(param.name)) in _PROTECTED_NORMALIZED and str(param.value).strip()
+    )
+
+def _mask_protected_value(name: str, value: Wikicode, protected: Dict[str, str]) -> str:
+    """Valeur du paramètre `name` (déjà sérialisé par l'appelant), masquée ⟪V_n⟫ si protégé
+    (espaces autour conservés), sinon rendue avec les valeurs protégées des templates imbriqués masquées."""
+    if _normalize_param_name(name) in _PROTECTED_NORMALIZED:
+        raw = str(value)
+        core = raw.strip()
+        if not core:
+            return raw
+        placeholder = f'⟪V_{len(protected)}⟫'
+        protected[placeholder] = core
+        return raw.replace(core, placeholder, 1)
+    return _mask_protected_values(value, protected)
+
+def _mask_protected_values(code: Wikicode, protected: Dict[str, str]) -> str:
+    # Même rendu que str(code) (Template: '{{' + nom + '|param'...), hors valeurs protégées
+    parts: List[str] = []
+    for node in code.nodes:
+        if type(node) is _Template:
+            parts.append('{{')
+            parts.append(str(node.name))
+            for param in node.params:
+                name = str(param.name)
+                value = _mask_protected_value(name, param.value, protected)
+                parts.append(f'|{name}={value}' if param.showkey else '|' + value)
+            parts.append('}}')
+        else:
+            parts.append(str(node))
+    return ''.join(parts)
+
+def mask_templates_for_translation(wikitext: str | Wikicode) -> Tuple[str, Dict[str, str], Dict[str, str]]:
     """Replace template names and parameter keys with placeholders to prevent their translation.
-    Returns (masked_wikitext, placeholder_mapping).
+    Returns (masked_wikitext, placeholder_mapping, protected_params).
 
     Placeholders use uncommon delimiters to avoid model alterations.
     Template names: ⟪TPL_i⟫
     Parameter keys: ⟪K_i_j⟫
-    Values are left intact for translation (unless later restored by protection logic).
+    Protected parameter values (PROTECTED_TEMPLATE_PARAMS, nested templates included): ⟪V_n⟫,
+    mapped to the original value in protected_params so they never reach the model.
+    Other values are left intact for translation.
     """
     try:
-        code = mwparserfromhell.parse(wikitext)
+        code = _as_code(wikitext)
     except Exception:
-        return wikitext, {}
+        return str(wikitext), {}, {}
     mapping: Dict[str, str] = {}
+    protected: Dict[str, str] = {}
     output_parts: List[str] = []
     tpl_index = 0
     for node in code.nodes:
-        if isinstance(node, mwparserfromhell.nodes.Template):
+        if type(node) is _Template:
             tpl_name_placeholder = f'⟪TPL_{tpl_index}⟫'
             mapping[tpl_name_placeholder] = str(node.name)
             param_strings: List[str] = []
             for param_index, param in enumerate(node.params):
                 key_placeholder = f'⟪K_{tpl_index}_{param_index}⟫'
-                mapping[key_placeholder] = str(param.name)
+                name = str(param.name)
+                mapping[key_placeholder] = name
                 # Keep raw value (string) for translation
-                param_strings.append(f'{key_placeholder}={param.value}')
-            masked = '{{' + tpl_name_placeholder
+                param_strings.append(f'{key_placeholder}={_mask_protected_value(name, param.value, protected)}')
+            # Fragments only; the single ''.join at the end does all the concatenation
+            output_parts.append('{{')
+            output_parts.append(tpl_name_placeholder)
             if param_strings:
-                masked += '|' + ' | '.join(param_strings)
-            masked += '}}'
-            output_parts.append(masked)
+                output_parts.append('|')
+                output_parts.append(' | '.join(param_strings))
+            output_parts.append('}}')
             tpl_index += 1
         else:
             output_parts.append(str(node))
-    return ''.join(output_parts), mapping
+    return ''.join(output_parts), mapping, protected
+
+# Any ⟪...⟫ placeholder (templates, parameter keys, JSON paths)
+_PLACEHOLDER_RE = re.compile(r'⟪[^⟪⟫]*⟫')
+
+def replace_placeholders(text: str, mapping: Dict[str, str]) -> str:
+    """Replace every known ⟪...⟫ placeholder in a single pass; unknown ones are left untouched."""
+    if not mapping:
+        return text
+    return _PLACEHOLDER_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), text)
 
 def restore_masked_templates(masked_translated_wikitext: str, mapping: Dict[str, str]) -> str:
     """Restore original template names and parameter keys from placeholder mapping."""
-    restored = masked_translated_wikitext
-    # Replace longer placeholders first (order doesn't really matter but deterministic)
-    for placeholder in sorted(mapping.keys(), key=lambda x: (-len(x), x)):
-        restored = restored.replace(placeholder, mapping[placeholder])
-    return restored
+    return replace_placeholders(masked_translated_wikitext, mapping)
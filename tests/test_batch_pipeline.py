@@ -0,0 +1,214 @@
+"""Test the multi-chunk OpenAI modes: the Batch API, translation cache and short-name requests."""
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from src.gpt_wiki_translator.openai_client import OpenAIClient, TranslationCache
+from src.gpt_wiki_translator.translation_pipeline import BatchTranslationPipeline
+
+
+def test_translate_chunks_batch_maps_results_by_custom_id():
+    ai = OpenAIClient()
+    ai.client = Mock()
+    ai.cache = TranslationCache()
+    uploaded = {}
+
+    def upload(file, purpose):
+        uploaded['path'] = Path(file.name)
+        uploaded['lines'] = file.read().decode('utf-8').splitlines()
+        return SimpleNamespace(id='file-in')
+
+    ai.client.files.create.side_effect = upload
+    ai.client.batches.create.return_value = SimpleNamespace(id='batch-1', status='in_progress')
+    ai.client.batches.retrieve.return_value = SimpleNamespace(id='batch-1', status='completed', output_file_id='file-out', error_file_id=None)
+    lines = [
+        {'custom_id': '0#1', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': 'Two'}}]}}, 'error': None},
+        {'custom_id': '0#0', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': 'One'}}]}}, 'error': None},
+        {'custom_id': '1#0', 'response': {'status_code': 500, 'body': {}}, 'error': None},
+    ]
+    ai.client.files.content.return_value = SimpleNamespace(text='\n'.join(json.dumps(l) for l in lines))
+
+    results = ai.translate_chunks_batch({'0#0': 'Un', '0#1': 'Deux', '1#0': 'Trois'}, 'fr', 'en', poll_interval=0)
+
+    assert results == {'0#0': 'One', '0#1': 'Two', '1#0': None}
+    submitted = [json.loads(l) for l in uploaded['lines']]
+    assert [item['custom_id'] for item in submitted] == ['0#0', '0#1', '1#0']
+    assert submitted[0]['url'] == '/v1/chat/completions'
+    assert not uploaded['path'].exists()  # temporary input removed after upload
+
+
+def test_translate_chunks_batch_cancels_past_max_wait():
+    ai = OpenAIClient()
+    ai.client = Mock()
+    ai.client.files.create.return_value = SimpleNamespace(id='file-in')
+    ai.client.batches.create.return_value = SimpleNamespace(id='batch-1', status='in_progress')
+
+    results = ai.translate_chunks_batch({'0#0': 'Un'}, 'fr', 'en', poll_interval=0, max_wait=0)
+
+    assert results == {'0#0': None}  # left for the live path
+    ai.client.batches.cancel.assert_called_once_with('batch-1')
+    ai.client.batches.retrieve.assert_not_called()
+
+
+def test_translate_chunks_batch_splits_input_and_reads_error_file():
+    from src.gpt_wiki_translator import openai_client
+    ai = OpenAIClient()
+    ai.client = Mock()
+    ai.client.files.create.return_value = SimpleNamespace(id='file-in')
+    ai.client.batches.create.side_effect = [
+        SimpleNamespace(id='batch-1', status='completed', output_file_id='out-1', error_file_id=None),
+        SimpleNamespace(id='batch-2', status='completed', output_file_id=None, error_file_id='err-2'),
+    ]
+    files = {
+        'out-1': {'custom_id': '0#0', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': 'One'}}]}}, 'error': None},
+        'err-2': {'custom_id': '0#1', 'response': {'status_code': 400, 'body': {'error': {'message': 'context too long'}}}, 'error': None},
+    }
+    ai.client.files.content.side_effect = lambda file_id: SimpleNamespace(text=json.dumps(files[file_id]))
+
+    with patch.object(openai_client, 'BATCH_MAX_REQUESTS', 1), patch.object(openai_client.logger, 'warning') as warning:
+        results = ai.translate_chunks_batch({'0#0': 'Un', '0#1': 'Deux'}, 'fr', 'en', poll_interval=0)
+
+    assert results == {'0#0': 'One', '0#1': None}
+    assert ai.client.batches.create.call_count == 2
+    # The failed request is reported with its error, read from the batch error file
+    assert warning.call_args[0][1:] == ('0#1', {'message': 'context too long'})
+
+
+def test_split_batch_lines_respects_count_and_size():
+    from src.gpt_wiki_translator.openai_client import _split_batch_lines
+    lines = {str(i): 'x' * 9 + '\n' for i in range(5)}
+    assert [len(part) for part in _split_batch_lines(lines, max_requests=2)] == [2, 2, 1]
+    assert [len(part) for part in _split_batch_lines(lines, max_bytes=25)] == [2, 2, 1]
+
+
+@patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
+def test_batch_pipeline_publishes_reassembled_pages(mock_ai_class, tmp_path):
+    source_mw = Mock()
+    target_mw = Mock()
+    ai = Mock()
+    mock_ai_class.return_value = ai
+
+    source_mw.get_langlinks_bulk.return_value = {'Blé': {'en': 'Wheat'}, 'Orge': {}}
+    source_mw.fetch_page_wikitext_bulk.return_value = {'Blé': 'Le blé.', 'Orge': "L'orge."}
+    target_mw.page_exists.side_effect = lambda title, **kwargs: (False, title)
+    ai.translate_short_names.side_effect = lambda names, *args: ['Barley' for _ in names]
+    ai.translate_chunks_batch.side_effect = lambda chunks, *args: {cid: f'EN {text}' for cid, text in chunks.items()}
+    ai.validate_translation.return_value = '{"issues": []}'
+
+    pipeline = BatchTranslationPipeline(
+        'https://fr.example.com/api.php', 'https://en.example.com/api.php', 'fr', 'en',
+        force=True, source_mw=source_mw, target_mw=target_mw, log_path=tmp_path / 'translated_log.csv',
+    )
+    pipeline.process_pages(['Blé', 'Orge'])
+
+    ai.translate_chunks_batch.assert_called_once()
+    ai.translate_short_names.assert_called_once()  # title translation only
+    ai.translate_chunk.assert_not_called()  # chunks went through the batch
+    published = {call[0][0]: call[0][1] for call in target_mw.create_or_update_page.call_args_list}
+    assert published['Wheat'].startswith('EN Le blé.')
+    assert published['Barley'].startswith("EN L'orge.")
+    # Both pages passed the local checks, so their chunk translations are cached
+    assert {call[0][0] for call in ai.cache_translation.call_args_list} == {'Le blé.', "L'orge."}
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_translate_chunk_reuses_cached_translation(tmp_path):
+    ai = OpenAIClient()
+    ai.client = Mock()
+    ai.cache = TranslationCache(str(tmp_path / 'cache.sqlite'))
+    ai.client.chat.completions.create.return_value = _completion('Wheat')
+
+    assert ai.translate_chunk('Blé', 'fr', 'en') == 'Wheat'
+    assert ai.translate_chunk('Blé', 'fr', 'en') == 'Wheat'
+    ai.client.chat.completions.create.assert_called_once()
+    # A new process (fresh in-memory cache) reads it back from sqlite
+    assert TranslationCache(str(tmp_path / 'cache.sqlite')).get(ai._cache_key('Blé', 'fr', 'en')) == 'Wheat'
+
+
+def test_translation_cache_key_covers_prompt_and_temperature():
+    base = TranslationCache.key('Blé', 'fr', 'en', 'model', 0.2, 'prompt')
+    assert TranslationCache.key('Blé', 'fr', 'en', 'model', 0.7, 'prompt') != base
+    assert TranslationCache.key('Blé', 'fr', 'en', 'model', 0.2, 'other prompt') != base
+
+
+def test_translate_chunk_store_false_and_force_skip_cache():
+    ai = OpenAIClient()
+    ai.client = Mock()
+    ai.cache = TranslationCache()
+    ai.client.chat.completions.create.side_effect = [_completion('Wheat'), _completion('Wheat!'), _completion('Wheat again')]
+
+    # Not stored until the caller validated it
+    assert ai.translate_chunk('Blé', 'fr', 'en', store=False) == 'Wheat'
+    assert ai.translate_chunk('Blé', 'fr', 'en') == 'Wheat!'
+    # --force: cached value is ignored, the new translation replaces it
+    forced = OpenAIClient(read_cache=False)
+    forced.client, forced.cache = ai.client, ai.cache
+    assert forced.translate_chunk('Blé', 'fr', 'en') == 'Wheat again'
+    assert ai.translate_chunk('Blé', 'fr', 'en') == 'Wheat again'
+    assert ai.client.chat.completions.create.call_count == 3
+
+
+def test_translate_short_names_one_request_in_order():
+    ai = OpenAIClient()
+    ai.client = Mock()
+    ai.cache = TranslationCache()
+    ai.client.chat.completions.create.return_value = _completion('{"translations": ["Wheat", "Barley"]}')
+
+    assert ai.translate_short_names(['Blé', 'Orge', 'Blé'], 'fr', 'en') == ['Wheat', 'Barley', 'Wheat']
+    ai.client.chat.completions.create.assert_called_once()
+    # Cached per name afterwards; a bad reply keeps the name unchanged
+    ai.client.chat.completions.create.return_value = _completion('not json')
+    assert ai.translate_short_names(['Orge', 'Seigle'], 'fr', 'en') == ['Barley', 'Seigle']
+
+
+@patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
+def test_title_and_json_subpage_names_share_one_request(mock_ai_class, tmp_path):
+    source_mw = Mock()
+    target_mw = Mock()
+    ai = Mock()
+    mock_ai_class.return_value = ai
+
+    source_mw.get_langlinks_bulk.return_value = {'Blé': {}}
+    source_mw.fetch_page_wikitext_bulk.return_value = {'Blé': '{{Graphique|json=Blé/Rendements.json}} Le blé.'}
+    source_mw.fetch_page_wikitext.return_value = 'not json'
+    target_mw.page_exists.side_effect = lambda title, **kwargs: (False, title)
+    ai.translate_short_names.return_value = ['Wheat', 'Yields']
+    ai.translate_chunks_batch.side_effect = lambda chunks, *args: {cid: text for cid, text in chunks.items()}
+    ai.validate_translation.return_value = '{"issues": []}'
+
+    pipeline = BatchTranslationPipeline(
+        'https://fr.example.com/api.php', 'https://en.example.com/api.php', 'fr', 'en',
+        force=True, source_mw=source_mw, target_mw=target_mw, log_path=tmp_path / 'translated_log.csv',
+    )
+    pipeline.process_pages(['Blé'])
+
+    ai.translate_short_names.assert_called_once_with(['Blé', 'Rendements'], 'fr', 'en')
+    target_mw.create_or_update_json_page.assert_called_once_with('Wheat/Yields.json', 'not json')
+
+
+@patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
+def test_batch_pipeline_translates_missing_chunks_live(mock_ai_class, tmp_path):
+    source_mw = Mock()
+    target_mw = Mock()
+    ai = Mock()
+    mock_ai_class.return_value = ai
+
+    source_mw.get_langlinks_bulk.return_value = {'Blé': {'en': 'Wheat'}}
+    source_mw.fetch_page_wikitext_bulk.return_value = {'Blé': 'Le blé.'}
+    target_mw.page_exists.side_effect = lambda title, **kwargs: (False, title)
+    # Batch cancelled past BATCH_MAX_WAIT_HOURS: nothing came back
+    ai.translate_chunks_batch.side_effect = lambda chunks, *args: {cid: None for cid in chunks}
+    ai.translate_chunk.side_effect = lambda text, *args, **kwargs: f'EN {text}'
+    ai.validate_translation.return_value = '{"issues": []}'
+
+    pipeline = BatchTranslationPipeline(
+        'https://fr.example.com/api.php', 'https://en.example.com/api.php', 'fr', 'en',
+        force=True, source_mw=source_mw, target_mw=target_mw, log_path=tmp_path / 'translated_log.csv',
+    )
+    pipeline.process_pages(['Blé'])
+
+    ai.translate_chunk.assert_called_once()
+    assert target_mw.create_or_update_page.call_args[0][1].startswith('EN Le blé.')
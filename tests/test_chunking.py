@@ -0,0 +1,89 @@
+"""Tests for section-based chunking and token estimation."""
+import sys
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+from gpt_wiki_translator.chunking import create_chunks, estimate_tokens, get_chunk_stats, split_by_sections
+
+SAMPLE = """Intro text.
+
+== Description ==
+Le trèfle est une plante.
+
+=== Variétés ===
+* Trèfle blanc
+
+== Culture ==
+Le trèfle se cultive facilement.
+"""
+
+def test_estimate_tokens_counts_something():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('Le trèfle est une plante légumineuse cultivée.') > 0
+
+def test_encoder_load_failure_is_retried(monkeypatch):
+    import tiktoken
+    from gpt_wiki_translator import chunking
+    calls = []
+
+    def flaky_get_encoding(name):
+        calls.append(name)
+        if len(calls) == 1:
+            raise OSError('network down')
+        return SimpleNamespace(encode=lambda text, disallowed_special=(): text.split())
+
+    monkeypatch.setattr(tiktoken, 'get_encoding', flaky_get_encoding)
+    monkeypatch.setattr(chunking, '_encoders', {})
+    monkeypatch.setattr(chunking, '_encoder_failures', {})
+    monkeypatch.setattr(chunking, 'ENCODER_RETRY_INTERVAL', 0.0)
+    chunking._count_tokens.cache_clear()
+    text = 'Le trèfle est une plante légumineuse cultivée.'
+    assert estimate_tokens(text) == len(text) // 3  # fallback while the BPE file is unavailable
+    assert estimate_tokens(text) == 7  # next call retries and gets the encoding
+    assert len(calls) == 2
+    chunking._count_tokens.cache_clear()
+
+def test_split_by_sections_returns_stripped_offsets():
+    sections = split_by_sections(SAMPLE)
+    assert [h.strip() for h, _, _ in sections] == ['', '== Description ==', '=== Variétés ===', '== Culture ==']
+    assert [SAMPLE[s:e] for _, s, e in sections] == [
+        'Intro text.', 'Le trèfle est une plante.', '* Trèfle blanc', 'Le trèfle se cultive facilement.'
+    ]
+
+def test_create_chunks_single_chunk_when_small():
+    chunks = create_chunks(SAMPLE, max_tokens=7000)
+    assert len(chunks) == 1
+    assert '== Description ==' in chunks[0]
+    assert '== Culture ==' in chunks[0]
+
+def test_create_chunks_splits_on_sections():
+    chunks = create_chunks(SAMPLE, max_tokens=10)
+    assert len(chunks) > 1
+    assert any(c.startswith('== Culture ==') for c in chunks)
+
+def test_get_chunk_stats():
+    chunks = create_chunks(SAMPLE, max_tokens=10)
+    stats = get_chunk_stats(chunks)
+    assert stats['count'] == len(chunks)
+    assert stats['total_chars'] == sum(len(c) for c in chunks)
+    assert stats['min_tokens'] <= stats['avg_tokens'] <= stats['max_tokens']
+    assert get_chunk_stats([])['count'] == 0
+
+def test_create_chunks_oversized_section_keeps_each_paragraph_once():
+    big = '== Long ==\n' + '\n\n'.join(f'Paragraph {i} ' + 'mot ' * 40 for i in range(5))
+    chunks = create_chunks(big, max_tokens=20)
+    joined = '\n\n'.join(chunks)
+    assert joined.count('== Long ==') == 1
+    for i in range(5):
+        assert joined.count(f'Paragraph {i} ') == 1
+    assert chunks[0].startswith('== Long ==\nParagraph 0')
+
+
+def test_oversized_section_is_not_split_inside_a_template():
+    template = "{{Fiche\n|Description=Premier paragraphe.\n\nSecond paragraphe.\n}}"
+    wikitext = "== Section ==\n" + "\n\n".join(["Texte " * 20, template, "Fin " * 20])
+
+    chunks = create_chunks(wikitext, max_tokens=15)
+
+    assert any(template in chunk for chunk in chunks)
+    assert all(chunk.count('{{') == chunk.count('}}') for chunk in chunks)
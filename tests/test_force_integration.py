@@ -5,7 +5,7 @@ sys.path.insert(0, 'src')
 
 from gpt_wiki_translator.translation_pipeline import TranslationPipeline
 
-def test_force_logic():
+def test_force_logic(tmp_path):
     """Test that force flag bypasses langlink check."""
     print("Testing force flag logic...")
     
@@ -20,7 +20,8 @@ def test_force_logic():
         'http://en.example.org/api.php',
         'fr', 'en',
         dry_run=True,
-        force=False
+        force=False,
+        log_path=tmp_path / 'translated_log.csv',
     )
     pipeline_no_force.source_mw = MockMW()
     
@@ -30,7 +31,8 @@ def test_force_logic():
         'http://en.example.org/api.php',
         'fr', 'en',
         dry_run=True,
-        force=True
+        force=True,
+        log_path=tmp_path / 'translated_log.csv',
     )
     pipeline_with_force.source_mw = MockMW()
     
@@ -42,7 +44,9 @@ def test_force_logic():
 
 if __name__ == '__main__':
     try:
-        test_force_logic()
+        import tempfile
+        from pathlib import Path
+        test_force_logic(Path(tempfile.mkdtemp()))
         print("\n✅ Integration test passed!")
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
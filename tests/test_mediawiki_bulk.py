@@ -0,0 +1,209 @@
+"""Test MediaWikiClient request batching (titles=A|B|C) and edit token handling."""
+import json
+from unittest.mock import Mock
+from src.gpt_wiki_translator.mediawiki_client import MediaWikiClient
+
+
+def _client_with_responses(*payloads):
+    client = MediaWikiClient('https://fr.example.com/api.php')
+    client.session = Mock()
+    responses = []
+    for payload in payloads:
+        resp = Mock()
+        resp.content = json.dumps(payload).encode('utf-8')
+        responses.append(resp)
+    client.session.post.side_effect = responses
+    return client
+
+
+def test_resolve_redirects_bulk():
+    client = _client_with_responses({
+        'query': {
+            'normalized': [{'from': 'Page_a', 'to': 'Page a'}],
+            'redirects': [{'from': 'Page a', 'to': 'Page b'}],
+            'pages': {
+                '12': {'pageid': 12, 'title': 'Page b'},
+                '13': {'pageid': 13, 'title': 'Plain'},
+                '-1': {'title': 'Missing', 'missing': ''},
+            },
+        }
+    })
+
+    resolved = client.resolve_redirects_bulk(['Page_a', 'Plain', 'Missing'])
+
+    assert resolved == {'Page_a': 'Page b', 'Plain': 'Plain', 'Missing': None}
+    client.session.post.assert_called_once()
+    assert client.session.post.call_args[1]['data']['titles'] == 'Page_a|Plain|Missing'
+
+
+def test_get_langlinks_bulk_follows_continuation():
+    client = _client_with_responses(
+        {
+            'continue': {'llcontinue': '12|es', 'continue': '||'},
+            'query': {'pages': {
+                '12': {'title': 'Blé', 'langlinks': [{'lang': 'en', '*': 'Wheat'}]},
+                '13': {'title': 'Orge'},
+            }},
+        },
+        {
+            'query': {'pages': {
+                '12': {'title': 'Blé', 'langlinks': [{'lang': 'es', '*': 'Trigo'}]},
+                '13': {'title': 'Orge'},
+            }},
+        },
+    )
+
+    links = client.get_langlinks_bulk(['Blé', 'Orge'])
+
+    assert links == {'Blé': {'en': 'Wheat', 'es': 'Trigo'}, 'Orge': {}}
+    assert client.session.post.call_count == 2
+    assert client.session.post.call_args[1]['data']['llcontinue'] == '12|es'
+
+
+def test_fetch_page_wikitext_bulk_maps_normalized_titles():
+    client = _client_with_responses({
+        'query': {
+            'normalized': [{'from': 'blé', 'to': 'Blé'}],
+            'pages': {
+                '12': {'title': 'Blé', 'revisions': [{'slots': {'main': {'*': 'Texte'}}}]},
+                '-1': {'title': 'Absent', 'missing': ''},
+            },
+        }
+    })
+
+    texts = client.fetch_page_wikitext_bulk(['blé', 'Absent'])
+
+    assert texts == {'blé': 'Texte', 'Absent': None}
+    client.session.post.assert_called_once()
+
+
+def test_edit_refetches_rejected_csrf_token():
+    client = _client_with_responses(
+        {'error': {'code': 'badtoken'}},
+        {'edit': {'result': 'Success'}},
+    )
+    client._csrf_token = 'stale+\\'
+    token_resp = Mock()
+    token_resp.content = json.dumps({'query': {'tokens': {'csrftoken': 'fresh+\\'}}}).encode('utf-8')
+    client.session.get.return_value = token_resp
+
+    resp = client.create_or_update_page('Blé', 'Texte')
+
+    assert resp == {'edit': {'result': 'Success'}}
+    assert client.session.post.call_count == 2
+    assert client.session.post.call_args[1]['data']['token'] == 'fresh+\\'
+
+
+def test_fetch_page_bundle_follows_redirect_in_one_query():
+    client = MediaWikiClient('https://en.example.com/api.php')
+    client.session = Mock()
+    resp = Mock()
+    resp.content = json.dumps({'query': {
+        'redirects': [{'from': 'Wheat (plant)', 'to': 'Wheat'}],
+        'pages': {'7': {'pageid': 7, 'title': 'Wheat', 'revisions': [{'slots': {'main': {'*': 'Text'}}}]}},
+    }}).encode('utf-8')
+    client.session.get.return_value = resp
+
+    bundle = client.fetch_page_bundle('Wheat (plant)')
+
+    assert bundle == {
+        'exists': True, 'is_redirect': True, 'redirect_target': 'Wheat',
+        'title': 'Wheat', 'wikitext': 'Text',
+    }
+    client.session.get.assert_called_once()
+
+
+def test_interwiki_edit_reads_page_past_http_cache():
+    client = MediaWikiClient('https://en.example.com/api.php')
+    client.session = Mock()
+    client._http_cached = True
+    resp = Mock()
+    resp.content = json.dumps({'query': {'pages': {'7': {'pageid': 7, 'title': 'Wheat', 'revisions': [{'slots': {'main': {'*': 'Text'}}}]}}}}).encode('utf-8')
+    client.session.get.return_value = resp
+    client.create_or_update_page = Mock(return_value={'edit': {'result': 'Success'}})
+
+    client.add_or_update_interwiki_link('Wheat', '[[fr:Blé]]')
+
+    assert client.session.get.call_args[1]['force_refresh'] is True
+    client.create_or_update_page.assert_called_once_with('Wheat', 'Text\n[[fr:Blé]]\n', summary='Add interwiki link')
+    # Plain reads may still be served from the cache
+    client.fetch_page_wikitext('Wheat')
+    assert 'force_refresh' not in client.session.get.call_args[1]
+
+
+def test_get_client_builds_one_client_per_endpoint_across_threads():
+    import threading
+    import time
+    from unittest.mock import patch
+    from src.gpt_wiki_translator import mediawiki_client
+
+    def slow_client(endpoint, verify_ssl=True):
+        time.sleep(0.05)  # login round-trip
+        return Mock(endpoint=endpoint)
+
+    mediawiki_client.get_client.cache_clear()
+    with patch.object(mediawiki_client, 'MediaWikiClient', side_effect=slow_client) as factory:
+        threads = [threading.Thread(target=mediawiki_client.get_client, args=('https://fr.example.com/api.php',)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    mediawiki_client.get_client.cache_clear()
+    factory.assert_called_once()
+
+
+def test_get_langlinks_fresh_fetches_links_only_past_http_cache():
+    client = MediaWikiClient('https://fr.example.com/api.php')
+    client.session = Mock()
+    client._http_cached = True
+    first, second = Mock(), Mock()
+    first.content = json.dumps({
+        'continue': {'llcontinue': '5|es', 'continue': '||'},
+        'query': {'pages': {'5': {'title': 'Blé', 'langlinks': [{'lang': 'en', '*': 'Wheat'}]}}},
+    }).encode('utf-8')
+    second.content = json.dumps({
+        'query': {'pages': {'5': {'title': 'Blé', 'langlinks': [{'lang': 'es', '*': 'Trigo'}]}}},
+    }).encode('utf-8')
+    client.session.get.side_effect = [first, second]
+
+    assert client.get_langlinks('Blé', fresh=True) == {'en': 'Wheat', 'es': 'Trigo'}
+    for call in client.session.get.call_args_list:
+        assert call[1]['params']['prop'] == 'langlinks'  # page text is not downloaded
+        assert call[1]['force_refresh'] is True
+    assert client.session.get.call_args[1]['params']['llcontinue'] == '5|es'
+
+
+def test_edits_are_not_retried_on_server_errors():
+    import pytest
+    import requests
+    client = MediaWikiClient('https://fr.example.com/api.php')
+    assert 'POST' not in client.session.get_adapter('https://fr.example.com').max_retries.allowed_methods
+    client.session = Mock()
+    client._csrf_token = 'token+\\'
+    failed = Mock(status_code=502)
+    failed.raise_for_status.side_effect = requests.HTTPError('502')
+    client.session.post.return_value = failed
+
+    with pytest.raises(requests.HTTPError):
+        client.create_or_update_page('Blé', 'Texte')
+    # The edit may have been applied before the 502: never sent twice
+    client.session.post.assert_called_once()
+
+
+def test_throttled_edit_and_query_post_are_retried():
+    client = MediaWikiClient('https://fr.example.com/api.php')
+    client.session = Mock()
+    client._csrf_token = 'token+\\'
+    throttled = Mock(status_code=429, headers={'Retry-After': '0'})
+    done = Mock(status_code=200)
+    done.content = json.dumps({'edit': {'result': 'Success'}}).encode('utf-8')
+    client.session.post.side_effect = [throttled, done]
+
+    assert client.create_or_update_page('Blé', 'Texte') == {'edit': {'result': 'Success'}}
+    assert client.session.post.call_count == 2
+
+    unavailable = Mock(status_code=503, headers={'Retry-After': '0'})
+    answered = Mock(status_code=200)
+    answered.content = json.dumps({'query': {}}).encode('utf-8')
+    client.session.post.side_effect = [unavailable, answered]
+    assert client._post_json({'action': 'query', 'titles': 'Blé'}) == {'query': {}}
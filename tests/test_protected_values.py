@@ -0,0 +1,30 @@
+"""Test that protected template values survive translation through the pipeline."""
+from unittest.mock import Mock, patch
+from src.gpt_wiki_translator.translation_pipeline import TranslationPipeline
+
+
+@patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
+def test_dropped_value_placeholder_is_restored_from_source(mock_ai_class, tmp_path):
+    source_mw = Mock()
+    target_mw = Mock()
+    ai = Mock()
+    mock_ai_class.return_value = ai
+
+    source_mw.get_langlinks.return_value = {}
+    source_mw.fetch_page_wikitext.return_value = "{{Fiche|image=Blé.jpg|nom=Blé}} Le blé."
+    target_mw.page_exists.return_value = (False, 'Wheat')
+    ai.translate_short_names.return_value = ['Wheat']
+    # The model translated the masked value instead of echoing ⟪V_0⟫ back
+    ai.translate_chunk.side_effect = lambda text, *args, **kwargs: text.replace('⟪V_0⟫', 'Wheat.jpg').replace('Le blé.', 'Wheat.')
+    ai.validate_translation.return_value = '{"issues": ["placeholder lost"]}'
+
+    pipeline = TranslationPipeline(
+        'https://fr.example.com/api.php', 'https://en.example.com/api.php', 'fr', 'en',
+        source_mw=source_mw, target_mw=target_mw, log_path=tmp_path / 'translated_log.csv',
+    )
+    pipeline.process_single_page('Blé')
+
+    published = target_mw.create_or_update_page.call_args[0][1]
+    assert 'image=Blé.jpg' in published
+    assert 'Wheat.jpg' not in published
+    assert 'Wheat.' in published
@@ -0,0 +1,44 @@
+"""Test the client-side OpenAI request/token buckets."""
+import sys
+sys.path.insert(0, 'src')
+
+from gpt_wiki_translator import openai_client
+from gpt_wiki_translator.openai_client import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_waits_for_token_bucket_refill(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(openai_client.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(openai_client.time, 'sleep', clock.sleep)
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600)
+
+    limiter.acquire(600)
+    assert clock.sleeps == []
+    # Bucket is empty: 300 tokens refill in 30s at 600 tokens/min
+    limiter.acquire(300)
+    assert sum(clock.sleeps) == 30
+
+
+def test_pause_holds_back_callers(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(openai_client.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(openai_client.time, 'sleep', clock.sleep)
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=0)
+
+    limiter.pause(10)
+    limiter.acquire(1000)
+
+    assert sum(clock.sleeps) == 10
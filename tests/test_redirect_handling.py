@@ -9,7 +9,7 @@ class TestRedirectHandling:
 
     @patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
     @patch('src.gpt_wiki_translator.translation_pipeline.MediaWikiClient')
-    def test_force_follows_redirect(self, mock_mw_class, mock_ai_class):
+    def test_force_follows_redirect(self, mock_mw_class, mock_ai_class, tmp_path):
         """When --force is used and target is a redirect, should use the final target page."""
         # Setup mocks
         source_mw = Mock()
@@ -39,7 +39,8 @@ class TestRedirectHandling:
             source_lang="fr",
             target_lang="en",
             dry_run=False,
-            force=True
+            force=True,
+            log_path=tmp_path / 'translated_log.csv',
         )
 
         # Process a page
@@ -57,7 +58,7 @@ class TestRedirectHandling:
 
     @patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
     @patch('src.gpt_wiki_translator.translation_pipeline.MediaWikiClient')
-    def test_no_force_does_not_follow_redirect(self, mock_mw_class, mock_ai_class):
+    def test_no_force_does_not_follow_redirect(self, mock_mw_class, mock_ai_class, tmp_path):
         """When --force is NOT used, should not follow redirects."""
         # Setup mocks
         source_mw = Mock()
@@ -81,7 +82,8 @@ class TestRedirectHandling:
             source_lang="fr",
             target_lang="en",
             dry_run=False,
-            force=False
+            force=False,
+            log_path=tmp_path / 'translated_log.csv',
         )
 
         # Process a page
@@ -0,0 +1,22 @@
+"""Test the CSV run log shared by the pipelines."""
+import csv
+from unittest.mock import Mock, patch
+from src.gpt_wiki_translator.translation_pipeline import TranslationPipeline, LOG_HEADER
+
+
+@patch('src.gpt_wiki_translator.translation_pipeline.OpenAIClient')
+def test_pipelines_share_one_log_handle(mock_ai_class, tmp_path):
+    log_path = tmp_path / 'translated_log.csv'
+    first = TranslationPipeline('https://fr.example.com/api.php', 'https://en.example.com/api.php', 'fr', 'en',
+                                source_mw=Mock(), target_mw=Mock(), log_path=log_path)
+    second = TranslationPipeline('https://fr.example.com/api.php', 'https://en.example.com/api.php', 'fr', 'en',
+                                 source_mw=Mock(), target_mw=Mock(), log_path=log_path)
+
+    assert first._log is second._log
+    first._append_log(['Blé', 'Wheat', 'fr', 'en', 'created', '2024-01-01T00:00:00+00:00', ''])
+    second._append_log(['Orge', 'Barley', 'fr', 'en', 'created', '2024-01-01T00:00:00+00:00', ''])
+
+    with log_path.open(encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == LOG_HEADER
+    assert [row[0] for row in rows[1:]] == ['Blé', 'Orge']
@@ -1,5 +1,12 @@
 import pytest
-from gpt_wiki_translator.wikitext_parser import restore_protected_template_params
+from unittest.mock import Mock
+from gpt_wiki_translator.wikitext_parser import (
+    restore_protected_template_params,
+    mask_templates_for_translation,
+    restore_masked_templates,
+    count_protected_template_params,
+    extract_json_template_params,
+)
 
 def test_restore_protected_template_params():
     # Original wikitext with protected and unprotected params
@@ -29,3 +36,46 @@ def test_restore_protected_template_params_case_insensitive():
     
     restored = restore_protected_template_params(original, translated)
     assert "Image = MyImage.jpg" in restored
+
+def test_restore_protected_template_params_survives_dropped_template():
+    # Templates are matched by name and rank, not by global position
+    original = "{{Note|texte=Attention}} {{Infobox | image = MyImage.jpg }} {{Infobox | image = Other.jpg }}"
+    translated = "{{Infobox | image = MonImage.jpg }} {{Infobox | image = Autre.jpg }}"
+
+    restored = restore_protected_template_params(original, translated)
+    assert restored == "{{Infobox | image = MyImage.jpg }} {{Infobox | image = Other.jpg }}"
+
+def test_restore_masked_templates_single_pass():
+    original = "{{Fiche|Nom=Blé}} texte {{T1|a=1}}" + "".join(f"{{{{T{i}}}}}" for i in range(2, 12))
+    masked, mapping, _ = mask_templates_for_translation(original)
+    assert "⟪TPL_11⟫" in masked
+
+    restored = restore_masked_templates(masked + " ⟪JSON_PATH_0⟫", mapping)
+
+    # ⟪TPL_1⟫ must not clobber ⟪TPL_10⟫/⟪TPL_11⟫; unknown placeholders are left for later
+    assert restored.startswith("{{Fiche|Nom=Blé}} texte {{T1|a=1}}{{T2}}")
+    assert "{{T11}}" in restored
+    assert restored.endswith(" ⟪JSON_PATH_0⟫")
+
+
+def test_mask_templates_masks_protected_values():
+    original = "{{Fiche|Nom=Blé|Image= Blé.jpg \n|Description={{Photo|logo=Logo.png|légende=Épi}}}}"
+    masked, mapping, protected = mask_templates_for_translation(original)
+
+    assert "Blé.jpg" not in masked and "Logo.png" not in masked
+    assert "Épi" in masked and "=Blé" in masked
+    assert sorted(protected.values()) == ["Blé.jpg", "Logo.png"]
+    assert count_protected_template_params(original) == len(protected)
+
+    restored = restore_masked_templates(masked, {**mapping, **protected})
+    assert "Image= Blé.jpg \n" in restored
+    assert "{{Photo|logo=Logo.png|légende=Épi}}" in restored
+
+
+def test_extract_json_template_params_fast_path_on_parsed_input():
+    import mwparserfromhell
+    text = "{{Carte|JSON = Blé/Données.json}} {{B|c={{C|json=Blé/Autre.json}}}}"
+    parsed = mwparserfromhell.parse(text)
+    assert extract_json_template_params(parsed, source=text) == ['Blé/Données.json', 'Blé/Autre.json']
+    # No 'json' in the source: the AST is not walked at all
+    assert extract_json_template_params(Mock(), source="{{Fiche|nom=Blé}}") == []